@@ -0,0 +1,365 @@
+import argparse
+from array import array
+from datetime import date, time
+import json
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from Clinic_System import APPOINTMENT_STATUSES, Clinic, minute_of_day
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+CANCELLED = APPOINTMENT_STATUSES.index("Cancelled")
+RESCHEDULED = APPOINTMENT_STATUSES.index("Rescheduled")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+HOURS = 24
+WEEKDAYS = 7
+
+class CodeTable:
+    def __init__(self, labels: Tuple[str, ...] = ()):
+        self._labels: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for label in labels:
+            self.code(label)
+    
+    def code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+    
+    def get_label(self, code: int) -> str:
+        return self._labels[code]
+    
+    def get_labels(self) -> List[str]:
+        return list(self._labels)
+    
+    def __len__(self) -> int:
+        return len(self._labels)
+
+def _weekday_counts(first: int, last: int) -> List[int]:
+    counts = [0] * WEEKDAYS
+    if last < first:
+        return counts
+    weeks, extra = divmod(last - first + 1, WEEKDAYS)
+    for weekday in range(WEEKDAYS):
+        counts[weekday] = weeks
+    for offset in range(extra):
+        counts[(first + offset + 3) % WEEKDAYS] += 1
+    return counts
+
+class AnalyticsSnapshot:
+    def __init__(self, use_numpy: Optional[bool] = None):
+        if use_numpy and not HAS_NUMPY:
+            raise RuntimeError("NumPy is not installed")
+        self._numpy = HAS_NUMPY if use_numpy is None else use_numpy
+        self.doctors = CodeTable()
+        self.specialties = CodeTable()
+        self._patients = CodeTable()
+        self._statuses = CodeTable(APPOINTMENT_STATUSES)
+        self._doctor_specialty = array("i")
+        self._days: Dict[object, int] = {}
+        self._minutes: Dict[object, int] = {}
+        
+        self._a_day = array("q")
+        self._a_start = array("H")
+        self._a_duration = array("H")
+        self._a_doctor = array("i")
+        self._a_patient = array("i")
+        self._a_status = array("b")
+        
+        self._c_day = array("q")
+        self._c_doctor = array("i")
+        self._c_patient = array("i")
+        self._c_fee = array("d")
+        self._frozen = False
+    
+    def uses_numpy(self) -> bool:
+        return self._numpy
+    
+    def _day(self, day) -> int:
+        ordinal = self._days.get(day)
+        if ordinal is None:
+            parsed = date.fromisoformat(day) if isinstance(day, str) else day
+            ordinal = self._days[day] = parsed.toordinal() - EPOCH_ORDINAL
+        return ordinal
+    
+    def _minute(self, value) -> int:
+        minute = self._minutes.get(value)
+        if minute is None:
+            parsed = time.fromisoformat(value) if isinstance(value, str) else value
+            minute = self._minutes[value] = minute_of_day(parsed)
+        return minute
+    
+    def _doctor(self, doctor_id: str, specialty: str) -> int:
+        code = self.doctors.code(doctor_id)
+        if code == len(self._doctor_specialty):
+            self._doctor_specialty.append(self.specialties.code(specialty))
+        return code
+    
+    def add_appointment(self, day, start, duration: int, doctor_id: str, specialty: str, status: str,
+                        patient_id: str) -> None:
+        self._a_day.append(self._day(day))
+        self._a_start.append(self._minute(start))
+        self._a_duration.append(duration)
+        self._a_doctor.append(self._doctor(doctor_id, specialty))
+        self._a_patient.append(self._patients.code(patient_id))
+        self._a_status.append(self._statuses.code(status))
+    
+    def add_consultation(self, day, doctor_id: str, specialty: str, fee: float, patient_id: str) -> None:
+        self._c_day.append(self._day(day))
+        self._c_doctor.append(self._doctor(doctor_id, specialty))
+        self._c_patient.append(self._patients.code(patient_id))
+        self._c_fee.append(fee)
+    
+    def freeze(self) -> 'AnalyticsSnapshot':
+        if self._frozen:
+            return self
+        self._frozen = True
+        if self._numpy:
+            self._doctor_specialty = np.asarray(self._doctor_specialty, dtype=np.int64)
+            self._a_day = np.asarray(self._a_day, dtype=np.int64).astype("datetime64[D]")
+            self._a_start = np.asarray(self._a_start, dtype=np.int64)
+            self._a_duration = np.asarray(self._a_duration, dtype=np.int64)
+            self._a_doctor = np.asarray(self._a_doctor, dtype=np.int64)
+            self._a_patient = np.asarray(self._a_patient, dtype=np.int64)
+            self._a_status = np.asarray(self._a_status, dtype=np.int8)
+            self._c_day = np.asarray(self._c_day, dtype=np.int64).astype("datetime64[D]")
+            self._c_doctor = np.asarray(self._c_doctor, dtype=np.int64)
+            self._c_patient = np.asarray(self._c_patient, dtype=np.int64)
+            self._c_fee = np.asarray(self._c_fee, dtype=np.float64)
+        return self
+    
+    @classmethod
+    def from_clinic(cls, clinic: Clinic, use_numpy: Optional[bool] = None) -> 'AnalyticsSnapshot':
+        snapshot = cls(use_numpy)
+        seen = set()
+        sources = []
+        for doctor in list(clinic._doctors):
+            with doctor._lock:
+                sources.append(list(doctor._schedule))
+        with clinic._appointment_index._lock:
+            sources.extend(list(appointments) for appointments in clinic._appointment_index._by_patient.values())
+        sources.append(clinic._archive.get_appointments())
+        for appointments in sources:
+            for appointment in appointments:
+                if appointment.get_id() in seen:
+                    continue
+                seen.add(appointment.get_id())
+                doctor = appointment.get_doctor()
+                snapshot.add_appointment(appointment.get_date(), appointment.get_time(), appointment.get_duration(),
+                                         doctor.get_id(), doctor.get_specialty(), appointment.get_status(),
+                                         appointment.get_patient().get_id())
+        
+        for patient in clinic._patients:
+            if patient._medical_history is None:
+                continue
+            for consultation in patient._medical_history:
+                doctor = consultation.get_doctor()
+                snapshot.add_consultation(consultation.get_date(), doctor.get_id(), doctor.get_specialty(),
+                                          consultation.calculate_fee(), patient.get_id())
+        return snapshot.freeze()
+    
+    @classmethod
+    def from_storage(cls, storage, use_numpy: Optional[bool] = None) -> 'AnalyticsSnapshot':
+        snapshot = cls(use_numpy)
+        with storage._lock:
+            appointments = storage._connection.execute(
+                "SELECT a.date, a.time, a.duration, a.doctor_id, d.specialty, a.status, a.patient_id "
+                "FROM appointments a JOIN doctors d ON d.id = a.doctor_id")
+            for row in appointments:
+                snapshot.add_appointment(*row)
+            consultations = storage._connection.execute(
+                "SELECT c.date, c.doctor_id, d.specialty, c.fee, c.patient_id "
+                "FROM consultations c JOIN doctors d ON d.id = c.doctor_id")
+            for row in consultations:
+                snapshot.add_consultation(*row)
+        return snapshot.freeze()
+    
+    def get_appointment_count(self) -> int:
+        return len(self._a_day)
+    
+    def get_consultation_count(self) -> int:
+        return len(self._c_day)
+    
+    def _day_range(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        if not len(self._a_day):
+            first, last = 0, -1
+        elif self._numpy:
+            days = self._a_day.astype(np.int64)
+            first, last = int(days.min()), int(days.max())
+        else:
+            first, last = min(self._a_day), max(self._a_day)
+        if start is not None:
+            first = start.toordinal() - EPOCH_ORDINAL
+        if end is not None:
+            last = end.toordinal() - EPOCH_ORDINAL
+        return first, last
+    
+    def utilization_heatmap(self, start: Optional[date] = None,
+                            end: Optional[date] = None) -> Dict[str, List[List[float]]]:
+        first, last = self._day_range(start, end)
+        capacity = [count * 60 for count in _weekday_counts(first, last)]
+        doctors = len(self.doctors)
+        
+        if self._numpy:
+            days = self._a_day.astype(np.int64)
+            mask = (self._a_status != CANCELLED) & (self._a_status != RESCHEDULED) & (days >= first) & (days <= last)
+            begin = self._a_start[mask]
+            finish = begin + self._a_duration[mask]
+            base = (self._a_doctor[mask] * WEEKDAYS + (days[mask] + 3) % WEEKDAYS) * HOURS
+            cells = doctors * WEEKDAYS * HOURS
+            minutes = np.zeros(cells, dtype=np.float64)
+            for hour in range(HOURS):
+                overlap = np.minimum(finish, (hour + 1) * 60) - np.maximum(begin, hour * 60)
+                hit = overlap > 0
+                if hit.any():
+                    minutes += np.bincount(base[hit] + hour, weights=overlap[hit], minlength=cells)
+            grid = minutes.reshape(doctors, WEEKDAYS, HOURS)
+            denominator = np.asarray(capacity, dtype=np.float64)[None, :, None]
+            utilization = np.divide(grid, denominator, out=np.zeros_like(grid), where=denominator > 0)
+            return {label: np.round(utilization[code], 4).tolist()
+                    for code, label in enumerate(self.doctors.get_labels())}
+        
+        grid = [[[0.0] * HOURS for _ in range(WEEKDAYS)] for _ in range(doctors)]
+        for i in range(len(self._a_day)):
+            day = self._a_day[i]
+            if self._a_status[i] in (CANCELLED, RESCHEDULED) or not first <= day <= last:
+                continue
+            begin = self._a_start[i]
+            finish = begin + self._a_duration[i]
+            row = grid[self._a_doctor[i]][(day + 3) % WEEKDAYS]
+            for hour in range(begin // 60, min(HOURS, -(-finish // 60))):
+                row[hour] += min(finish, (hour + 1) * 60) - max(begin, hour * 60)
+        return {label: [[round(minutes / capacity[weekday], 4) if capacity[weekday] else 0.0
+                         for minutes in grid[code][weekday]] for weekday in range(WEEKDAYS)]
+                for code, label in enumerate(self.doctors.get_labels())}
+    
+    def _attendance_keys(self, days, doctors, patients):
+        return (patients * len(self.doctors) + doctors) * (1 << 20) + days
+    
+    def status_rates(self, by: str = "specialty", as_of: Optional[date] = None) -> Dict[str, Dict]:
+        if by not in ("specialty", "doctor"):
+            raise ValueError(f"Cannot group appointments by {by}")
+        labels = self.specialties if by == "specialty" else self.doctors
+        today = (as_of or date.today()).toordinal() - EPOCH_ORDINAL
+        
+        if self._numpy:
+            groups = self._doctor_specialty[self._a_doctor] if by == "specialty" else self._a_doctor
+            days = self._a_day.astype(np.int64)
+            cancelled = self._a_status == CANCELLED
+            rescheduled = self._a_status == RESCHEDULED
+            past = ~cancelled & ~rescheduled & (days < today)
+            attended = np.isin(self._attendance_keys(days, self._a_doctor, self._a_patient),
+                               self._attendance_keys(self._c_day.astype(np.int64), self._c_doctor,
+                                                     self._c_patient))
+            size = len(labels)
+            counts = zip(np.bincount(groups[~rescheduled], minlength=size).tolist(),
+                         np.bincount(groups[cancelled], minlength=size).tolist(),
+                         np.bincount(groups[past], minlength=size).tolist(),
+                         np.bincount(groups[past & attended], minlength=size).tolist(),
+                         np.bincount(groups[rescheduled], minlength=size).tolist())
+        else:
+            attended_keys = {self._attendance_keys(self._c_day[i], self._c_doctor[i], self._c_patient[i])
+                             for i in range(len(self._c_day))}
+            totals = [[0, 0, 0, 0, 0] for _ in range(len(labels))]
+            for i in range(len(self._a_day)):
+                doctor = self._a_doctor[i]
+                group = totals[self._doctor_specialty[doctor] if by == "specialty" else doctor]
+                if self._a_status[i] == RESCHEDULED:
+                    group[4] += 1
+                    continue
+                group[0] += 1
+                if self._a_status[i] == CANCELLED:
+                    group[1] += 1
+                elif self._a_day[i] < today:
+                    group[2] += 1
+                    if self._attendance_keys(self._a_day[i], doctor, self._a_patient[i]) in attended_keys:
+                        group[3] += 1
+            counts = totals
+        
+        rates = {}
+        for code, (total, cancelled_count, past_count, attended_count, rescheduled_count) in enumerate(counts):
+            if not total and not rescheduled_count:
+                continue
+            rates[labels.get_label(code)] = {
+                'appointments': total,
+                'cancelled': cancelled_count,
+                'rescheduled': rescheduled_count,
+                'attended': attended_count,
+                'no_shows': past_count - attended_count,
+                'cancellation_rate': round(cancelled_count / total, 4) if total else 0.0,
+                'no_show_rate': round((past_count - attended_count) / past_count, 4) if past_count else 0.0
+            }
+        return rates
+    
+    def revenue_by_specialty(self, by_year: bool = True) -> Dict[str, Dict]:
+        if self._numpy:
+            specialties = self._doctor_specialty[self._c_doctor]
+            if by_year:
+                years = self._c_day.astype("datetime64[Y]").astype(np.int64) + 1970
+            else:
+                years = np.zeros(len(specialties), dtype=np.int64)
+            first_year = int(years.min()) if len(years) else 0
+            span = int(years.max()) - first_year + 1 if len(years) else 1
+            keys = specialties * span + (years - first_year)
+            revenue = np.bincount(keys, weights=self._c_fee, minlength=len(self.specialties) * span)
+            consultations = np.bincount(keys, minlength=len(self.specialties) * span)
+            totals = {(int(key) // span, int(key) % span + first_year): (float(revenue[key]), int(consultations[key]))
+                      for key in np.flatnonzero(consultations)}
+        else:
+            totals = {}
+            for i in range(len(self._c_day)):
+                year = date.fromordinal(self._c_day[i] + EPOCH_ORDINAL).year if by_year else 0
+                key = (self._doctor_specialty[self._c_doctor[i]], year)
+                revenue, consultations = totals.get(key, (0.0, 0))
+                totals[key] = (revenue + self._c_fee[i], consultations + 1)
+        
+        report: Dict[str, Dict] = {}
+        for (specialty, year), (revenue, consultations) in sorted(totals.items()):
+            entry = {'revenue': round(revenue, 2), 'consultations': consultations}
+            if by_year:
+                report.setdefault(self.specialties.get_label(specialty), {})[year] = entry
+            else:
+                report[self.specialties.get_label(specialty)] = entry
+        return report
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate CliniSoft appointment and consultation history")
+    parser.add_argument("database", help="SQLite database to analyze")
+    parser.add_argument("--report", choices=["heatmap", "rates", "revenue", "all"], default="all")
+    parser.add_argument("--by", choices=["specialty", "doctor"], default="specialty")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat)
+    parser.add_argument("--to", dest="end", type=date.fromisoformat)
+    parser.add_argument("--pure-python", action="store_true", help="do not use NumPy even when it is installed")
+    args = parser.parse_args(argv)
+    
+    from Clinic_Storage import SQLiteStorage
+    storage = SQLiteStorage(args.database)
+    started = perf_counter()
+    snapshot = AnalyticsSnapshot.from_storage(storage, False if args.pure_python else None)
+    storage.close()
+    load_seconds = perf_counter() - started
+    
+    started = perf_counter()
+    result = {}
+    if args.report in ("heatmap", "all"):
+        result['utilization_heatmap'] = snapshot.utilization_heatmap(args.start, args.end)
+    if args.report in ("rates", "all"):
+        result['status_rates'] = snapshot.status_rates(args.by)
+    if args.report in ("revenue", "all"):
+        result['revenue_by_specialty'] = snapshot.revenue_by_specialty()
+    result['engine'] = "numpy" if snapshot.uses_numpy() else "python"
+    result['appointments'] = snapshot.get_appointment_count()
+    result['consultations'] = snapshot.get_consultation_count()
+    result['load_seconds'] = round(load_seconds, 3)
+    result['aggregate_seconds'] = round(perf_counter() - started, 3)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
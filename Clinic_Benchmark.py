@@ -0,0 +1,261 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+import json
+import platform
+import random
+from time import perf_counter
+import tracemalloc
+from typing import Callable, Dict, List
+
+from Clinic_System import Appointment, Clinic, Consultation, ConsultingRoom, Doctor, Patient, Secretary
+
+FIRST_NAMES = ["Juan", "Ana", "Carlos", "María", "José", "Luis", "Laura", "Pedro", "Sofía", "Diego"]
+LAST_NAMES = ["Pérez", "García", "Gómez", "López", "Rodríguez", "Sánchez", "Ramírez", "Torres"]
+SPECIALTIES = ["Cardiology", "Urology", "Pediatrics", "Dermatology", "General"]
+SLOTS_PER_DAY = 20
+
+def generate_patients(count: int, seed: int = 7) -> List[Patient]:
+    rng = random.Random(seed)
+    return [Patient(f"P{i:07d}", rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{i}",
+                    f"patient{i}@mail.com", f"9{i:08d}", date(1950 + i % 60, 1 + i % 12, 1 + i % 28))
+            for i in range(count)]
+
+def generate_doctors(count: int, seed: int = 7) -> List[Doctor]:
+    rng = random.Random(seed)
+    doctors = []
+    for i in range(count):
+        doctor = Doctor(f"M{i:05d}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f"doctor{i}@clinic.com",
+                        f"9{i:08d}", SPECIALTIES[i % len(SPECIALTIES)], float(rng.choice((80, 100, 120, 150))))
+        for weekday in range(7):
+            doctor.set_working_hours(weekday, [(time(8), time(18))])
+        doctors.append(doctor)
+    return doctors
+
+def generate_slots(appointments_per_doctor: int, start_day: date) -> List[tuple]:
+    return [(start_day + timedelta(days=slot // SLOTS_PER_DAY),
+             time(8 + (slot % SLOTS_PER_DAY) // 2, 30 * (slot % 2)))
+            for slot in range(appointments_per_doctor)]
+
+def time_operation(operation: Callable[[int], object], count: int) -> Dict:
+    started = perf_counter()
+    for index in range(count):
+        operation(index)
+    elapsed = perf_counter() - started
+    return {
+        'operations': count,
+        'seconds': round(elapsed, 4),
+        'ops_per_second': round(count / elapsed, 1) if elapsed else None,
+        'microseconds_per_op': round(elapsed * 1e6 / count, 3) if count else None
+    }
+
+def build_clinic(doctors: int, patients: int) -> Clinic:
+    clinic = Clinic("Benchmark Clinic", "Lima, Peru")
+    for i in range(doctors):
+        clinic.hire_doctor(Doctor(f"M{i:05d}", "Doctor", f"N{i}", "doctor@clinic.com", "000000000",
+                                  "General", 100.0))
+    for i in range(patients):
+        clinic.register_patient(Patient(f"P{i:07d}", "Patient", f"N{i}", "patient@clinic.com", "000000000",
+                                        date(1980, 1, 1)))
+    return clinic
+
+def benchmark_concurrent_booking(doctors: int = 20, requests: int = 20000, workers: int = 8,
+                                 days: int = 5, seed: int = 7) -> Dict:
+    clinic = build_clinic(doctors, 1000)
+    secretary = Secretary("S001", "Bench", "Secretary", "bench@clinic.com", "000000000", "Morning", "Admission")
+    patients = list(clinic._patients)
+    rng = random.Random(seed)
+    start_day = date(2030, 1, 1)
+    slots = [(start_day + timedelta(days=rng.randrange(days)), time(8 + rng.randrange(10), rng.choice((0, 30))))
+             for _ in range(requests)]
+    targets = [(clinic._doctors[rng.randrange(doctors)], patients[rng.randrange(len(patients))])
+               for _ in range(requests)]
+    
+    def book(index: int):
+        doctor, patient = targets[index]
+        day, start = slots[index]
+        return secretary.schedule_medical_appointment(doctor, patient, day, start, "General consultation")
+    
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        booked = [appointment for appointment in pool.map(book, range(requests)) if appointment]
+    elapsed = perf_counter() - started
+    
+    overlaps = 0
+    for doctor in clinic._doctors:
+        previous_end = {}
+        for appointment in doctor._schedule:
+            if appointment.get_start_minute() < previous_end.get(appointment.get_date(), -1):
+                overlaps += 1
+            previous_end[appointment.get_date()] = appointment.get_end_minute()
+    
+    return {
+        'workers': workers,
+        'seed': seed,
+        'doctors': doctors,
+        'requests': requests,
+        'booked': len(booked),
+        'rejected': requests - len(booked),
+        'double_bookings': overlaps,
+        'duplicate_ids': len(booked) - len({appointment.get_id() for appointment in booked}),
+        'elapsed_seconds': round(elapsed, 4),
+        'requests_per_second': round(requests / elapsed, 1)
+    }
+
+def benchmark_memory(patients: int = 100000, appointments: int = 100000, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    clinic = build_clinic(10, 0)
+    doctors = clinic._doctors
+    
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(patients):
+        clinic._register(Patient(f"P{i:07d}", rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{i}",
+                                 f"patient{i}@mail.com", f"9{i:08d}", date(1950 + i % 60, 1 + i % 12, 1 + i % 28)))
+    after_patients = tracemalloc.get_traced_memory()[0]
+    
+    registered = list(clinic._patients._by_id.values())
+    start_day = date(2030, 1, 1)
+    booked = 0
+    for i in range(appointments):
+        doctor = doctors[i % len(doctors)]
+        slot = i // len(doctors)
+        day = start_day + timedelta(days=slot // 20)
+        start = time(8 + (slot % 20) // 2, 30 * (slot % 2))
+        appointment = Appointment(f"A{i:08d}", day, start, doctor, registered[i % len(registered)],
+                                  "General consultation")
+        booked += doctor._book(appointment)
+    after_appointments = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    return {
+        'patients': patients,
+        'appointments': booked,
+        'bytes_per_patient': round((after_patients - baseline) / patients, 1) if patients else 0.0,
+        'bytes_per_appointment': round((after_appointments - after_patients) / booked, 1) if booked else 0.0
+    }
+
+def benchmark_operations(patients: int = 10000, doctors: int = 50, appointments_per_doctor: int = 200,
+                         consultations_per_patient: int = 1, lookups: int = 10000, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    clinic = Clinic("Benchmark Clinic", "Lima, Peru")
+    secretary = Secretary("S001", "Bench", "Secretary", "bench@clinic.com", "000000000", "Morning", "Admission")
+    staff = generate_doctors(doctors, seed)
+    for doctor in staff:
+        clinic.hire_doctor(doctor)
+    for number, doctor in enumerate(staff, 100):
+        clinic.add_consulting_room(ConsultingRoom(number, doctor.get_specialty()))
+    
+    population = generate_patients(patients, seed)
+    results = {'register_patient': time_operation(lambda i: clinic.register_patient(population[i]), patients)}
+    
+    ids = [population[rng.randrange(patients)].get_id() for _ in range(lookups)]
+    results['find_patient_by_id'] = time_operation(lambda i: clinic.find_patient_by_id(ids[i]), lookups)
+    
+    queries = [population[rng.randrange(patients)].get_last_name()[:rng.randint(4, 8)]
+               for _ in range(min(lookups, 1000))]
+    results['name_index_build'] = time_operation(lambda i: clinic.find_patient_by_name(queries[0], 10), 1)
+    results['find_patient_by_name'] = time_operation(lambda i: clinic.find_patient_by_name(queries[i], 10),
+                                                     len(queries))
+    
+    start_day = date(2030, 1, 1)
+    slots = generate_slots(appointments_per_doctor, start_day)
+    bookings = [(doctor, day, start) for day, start in slots for doctor in staff]
+    results['schedule_medical_appointment'] = time_operation(
+        lambda i: secretary.schedule_medical_appointment(bookings[i][0], population[i % patients], bookings[i][1],
+                                                         bookings[i][2], "General consultation"),
+        len(bookings))
+    
+    days = max(1, (appointments_per_doctor + SLOTS_PER_DAY - 1) // SLOTS_PER_DAY)
+    date_lookups = [(staff[rng.randrange(doctors)], start_day + timedelta(days=rng.randrange(days)))
+                    for _ in range(lookups)]
+    results['get_appointments_by_date'] = time_operation(
+        lambda i: date_lookups[i][0]._schedule.get_appointments_by_date(date_lookups[i][1]), lookups)
+    
+    history_start = date(2029, 1, 1)
+    consultations = [(population[i // consultations_per_patient], staff[rng.randrange(doctors)],
+                      history_start + timedelta(days=rng.randrange(365)))
+                     for i in range(patients * consultations_per_patient)]
+    results['add_consultation'] = time_operation(
+        lambda i: consultations[i][0].add_consultation(
+            Consultation(f"K{i:08d}", consultations[i][2], time(9), consultations[i][1], consultations[i][0])),
+        len(consultations))
+    
+    periods = [(history_start + timedelta(days=offset), history_start + timedelta(days=offset + length))
+               for offset, length in ((rng.randrange(365), rng.choice((7, 30, 365))) for _ in range(100))]
+    results['generate_payment_reports'] = time_operation(
+        lambda i: clinic.generate_payment_reports(*periods[i]), len(periods))
+    
+    return {
+        'patients': patients,
+        'doctors': doctors,
+        'appointments_per_doctor': appointments_per_doctor,
+        'consultations_per_patient': consultations_per_patient,
+        'operations': results
+    }
+
+def compare_results(baseline: Dict, current: Dict) -> List[str]:
+    lines = []
+    previous_runs = {run['patients']: run for run in baseline.get('operations', [])}
+    for new in current.get('operations', []):
+        old = previous_runs.get(new['patients'])
+        if old is None:
+            continue
+        for name, timing in new['operations'].items():
+            previous = old['operations'].get(name)
+            if not previous or not previous['microseconds_per_op'] or timing['microseconds_per_op'] is None:
+                continue
+            ratio = timing['microseconds_per_op'] / previous['microseconds_per_op']
+            lines.append(f"{new['patients']:>9} patients  {name:<30} {previous['microseconds_per_op']:>10.3f} -> "
+                         f"{timing['microseconds_per_op']:>10.3f} us/op  ({ratio:.2f}x)")
+    return lines
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="CliniSoft benchmarks")
+    parser.add_argument("--suites", nargs="+", choices=["operations", "concurrency", "memory"],
+                        default=["operations", "concurrency", "memory"])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="patient counts for the operations suite (up to 1000000)")
+    parser.add_argument("--appointments-per-doctor", type=int, default=200)
+    parser.add_argument("--consultations-per-patient", type=int, default=1)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--doctors", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--memory-patients", type=int, default=100000)
+    parser.add_argument("--memory-appointments", type=int, default=100000)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args(argv)
+    
+    results: Dict = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed
+    }
+    if "operations" in args.suites:
+        results['operations'] = [benchmark_operations(scale, max(10, scale // 1000), args.appointments_per_doctor,
+                                                      args.consultations_per_patient, args.lookups, args.seed)
+                                 for scale in args.scales]
+    if "concurrency" in args.suites:
+        results['concurrent_booking'] = [benchmark_concurrent_booking(args.doctors, args.requests, workers,
+                                                                      seed=args.seed)
+                                         for workers in args.workers]
+    if "memory" in args.suites:
+        results['memory'] = benchmark_memory(args.memory_patients, args.memory_appointments)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as target:
+            target.write(output + "\n")
+    print(output)
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as source:
+            baseline = json.load(source)
+        for line in compare_results(baseline, results):
+            print(line)
+
+if __name__ == "__main__":
+    main()
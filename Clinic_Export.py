@@ -0,0 +1,75 @@
+import argparse
+import csv
+from datetime import date
+import json
+import sys
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from Clinic_System import PATIENT_ORDERS, Clinic, Patient
+
+EXPORT_FIELDS = ("id", "name", "last_name", "email", "phone", "birth_date", "age", "registered_on")
+
+def _write_chunk(target: TextIO, fmt: str, writer: Optional[csv.DictWriter], rows: List[Dict]) -> None:
+    if fmt == "csv":
+        writer.writerows(rows)
+    else:
+        target.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+    target.flush()
+
+def export_patients(patients: Iterable[Patient], target: TextIO, fmt: str = "csv", chunk_size: int = 5000) -> int:
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(target, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    
+    exported = 0
+    chunk = []
+    for patient in patients:
+        chunk.append(patient.to_dict())
+        if len(chunk) >= chunk_size:
+            _write_chunk(target, fmt, writer, chunk)
+            exported += len(chunk)
+            chunk = []
+    if chunk:
+        _write_chunk(target, fmt, writer, chunk)
+        exported += len(chunk)
+    return exported
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export the CliniSoft patient registry")
+    parser.add_argument("database", help="SQLite database to export from")
+    parser.add_argument("--output", help="output file (default: standard output)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="output format (default: from file extension)")
+    parser.add_argument("--order-by", choices=PATIENT_ORDERS, default="id")
+    parser.add_argument("--min-age", type=int)
+    parser.add_argument("--max-age", type=int)
+    parser.add_argument("--registered-from", type=date.fromisoformat)
+    parser.add_argument("--registered-to", type=date.fromisoformat)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+    
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output and args.output.endswith((".jsonl", ".ndjson")) else "csv"
+    
+    from Clinic_Storage import SQLiteStorage
+    clinic = Clinic("Marbella Clinic", "Lima, Peru", SQLiteStorage(args.database))
+    patients = clinic.iter_patients(args.order_by, None, args.min_age, args.max_age,
+                                    args.registered_from, args.registered_to)
+    
+    started = perf_counter()
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as target:
+            exported = export_patients(patients, target, fmt, args.chunk_size)
+    else:
+        exported = export_patients(patients, sys.stdout, fmt, args.chunk_size)
+    clinic.close()
+    
+    print(f"patients: {exported} exported in {perf_counter() - started:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
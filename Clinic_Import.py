@@ -0,0 +1,234 @@
+import argparse
+import csv
+from datetime import date, time
+import json
+import sys
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Clinic_System import (APPOINTMENT_STATUSES, DEFAULT_APPOINTMENT_MINUTES, INACTIVE_STATUSES, Appointment,
+                           Clinic, Patient, appointment_ids)
+
+PATIENT_FIELDS = ("id", "name", "last_name", "birth_date")
+APPOINTMENT_FIELDS = ("doctor_id", "patient_id", "date", "time", "consultation_type")
+
+Record = Tuple[int, Optional[Dict[str, str]]]
+
+class ImportReport:
+    MAX_ERRORS = 100
+    
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.elapsed = 0.0
+    
+    def reject(self, line_number: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line_number, reason))
+    
+    def get_throughput(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+    
+    def to_dict(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'rows_read': self.rows_read,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'errors': [{'line': line, 'reason': reason} for line, reason in self.errors],
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.get_throughput(), 1)
+        }
+    
+    def __str__(self) -> str:
+        return (f"{self.kind}: {self.imported} imported, {self.duplicates} duplicates, "
+                f"{self.rejected} rejected of {self.rows_read} rows in {self.elapsed:.2f}s "
+                f"({self.get_throughput():,.0f} rows/s)")
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Record]:
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == "jsonl":
+            for line_number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                yield line_number, record if isinstance(record, dict) else None
+        else:
+            raise ValueError(f"Unsupported import format: {fmt}")
+
+def read_chunks(records: Iterable[Record], chunk_size: int) -> Iterator[List[Record]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _parse_column(chunk: List[Record], field: str, parser: Callable) -> Dict[str, object]:
+    parsed = {}
+    for _, record in chunk:
+        if record is None:
+            continue
+        value = str(record.get(field) or "").strip()
+        if value in parsed:
+            continue
+        try:
+            parsed[value] = parser(value)
+        except ValueError:
+            parsed[value] = None
+    return parsed
+
+def _field(record: Dict, name: str) -> str:
+    return str(record.get(name) or "").strip()
+
+def _missing_fields(record: Dict, fields: Tuple[str, ...]) -> List[str]:
+    return [name for name in fields if not _field(record, name)]
+
+def import_patients(clinic: Clinic, path: str, fmt: Optional[str] = None, chunk_size: int = 5000) -> ImportReport:
+    report = ImportReport("patients")
+    started = perf_counter()
+    today = date.today()
+    
+    for chunk in read_chunks(read_records(path, fmt), chunk_size):
+        birth_dates = _parse_column(chunk, "birth_date", date.fromisoformat)
+        
+        with clinic.transaction():
+            for line_number, record in chunk:
+                report.rows_read += 1
+                if record is None:
+                    report.reject(line_number, "malformed record")
+                    continue
+                
+                missing = _missing_fields(record, PATIENT_FIELDS)
+                if missing:
+                    report.reject(line_number, f"missing {', '.join(missing)}")
+                    continue
+                
+                birth_date = birth_dates[_field(record, "birth_date")]
+                if birth_date is None or birth_date > today:
+                    report.reject(line_number, f"invalid birth_date {_field(record, 'birth_date')!r}")
+                    continue
+                
+                patient = Patient(_field(record, "id"), _field(record, "name"), _field(record, "last_name"),
+                                  _field(record, "email"), _field(record, "phone"), birth_date)
+                if clinic._register(patient):
+                    report.imported += 1
+                else:
+                    report.duplicates += 1
+    
+    report.elapsed = perf_counter() - started
+    return report
+
+def import_appointments(clinic: Clinic, path: str, fmt: Optional[str] = None, chunk_size: int = 5000) -> ImportReport:
+    report = ImportReport("appointments")
+    started = perf_counter()
+    seen_ids = set()
+    storage = clinic._storage
+    
+    for chunk in read_chunks(read_records(path, fmt), chunk_size):
+        dates = _parse_column(chunk, "date", date.fromisoformat)
+        times = _parse_column(chunk, "time", time.fromisoformat)
+        
+        with clinic.transaction():
+            for line_number, record in chunk:
+                report.rows_read += 1
+                if record is None:
+                    report.reject(line_number, "malformed record")
+                    continue
+                
+                missing = _missing_fields(record, APPOINTMENT_FIELDS)
+                if missing:
+                    report.reject(line_number, f"missing {', '.join(missing)}")
+                    continue
+                
+                appointment_id = _field(record, "id") or appointment_ids.next_id()
+                if appointment_id in seen_ids or (storage is not None and storage.has_appointment(appointment_id)):
+                    report.duplicates += 1
+                    continue
+                
+                appointment_date = dates[_field(record, "date")]
+                appointment_time = times[_field(record, "time")]
+                if appointment_date is None or appointment_time is None:
+                    report.reject(line_number, "invalid date or time")
+                    continue
+                
+                status = _field(record, "status") or "Scheduled"
+                if status not in APPOINTMENT_STATUSES:
+                    report.reject(line_number, f"unknown status {status!r}")
+                    continue
+                
+                try:
+                    duration = int(_field(record, "duration") or DEFAULT_APPOINTMENT_MINUTES)
+                except ValueError:
+                    report.reject(line_number, "invalid duration")
+                    continue
+                
+                doctor = clinic.find_doctor_by_id(_field(record, "doctor_id"))
+                patient = clinic.find_patient_by_id(_field(record, "patient_id"))
+                if doctor is None or patient is None:
+                    report.reject(line_number, "unknown doctor or patient")
+                    continue
+                
+                try:
+                    appointment = Appointment(appointment_id, appointment_date, appointment_time, doctor, patient,
+                                              _field(record, "consultation_type"), duration)
+                except ValueError as error:
+                    report.reject(line_number, str(error))
+                    continue
+                
+                appointment._status = sys.intern(status)
+                if status in INACTIVE_STATUSES:
+                    doctor._notify("appointment_imported", appointment)
+                elif not doctor._book(appointment):
+                    report.reject(line_number, "slot not available")
+                    continue
+                
+                seen_ids.add(appointment_id)
+                report.imported += 1
+    
+    report.elapsed = perf_counter() - started
+    return report
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import patients or appointments into CliniSoft")
+    parser.add_argument("kind", choices=["patients", "appointments"])
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("--database", help="SQLite database to import into (validation only when omitted)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+    
+    storage = None
+    if args.database:
+        from Clinic_Storage import SQLiteStorage
+        storage = SQLiteStorage(args.database)
+    clinic = Clinic("Marbella Clinic", "Lima, Peru", storage)
+    
+    importer = import_patients if args.kind == "patients" else import_appointments
+    report = importer(clinic, args.path, args.format, args.chunk_size)
+    clinic.close()
+    
+    print(report)
+    for line_number, reason in report.errors:
+        print(f"  line {line_number}: {reason}")
+
+if __name__ == "__main__":
+    main()
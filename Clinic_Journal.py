@@ -0,0 +1,524 @@
+import argparse
+from datetime import date, time
+import glob
+import json
+import os
+import threading
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from Clinic_System import INACTIVE_STATUSES, Appointment, Clinic, Consultation, ConsultingRoom, Doctor, Patient
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+SEGMENT_PATTERN = "journal-*.log"
+SNAPSHOT_BATCH = 1000
+
+class ClinicJournal:
+    def __init__(self, directory: str, sync: bool = True, snapshot_every: int = 100000):
+        self._directory = directory
+        self._sync = sync
+        self._snapshot_every = snapshot_every
+        self._clinic = None
+        self._condition = threading.Condition()
+        self._pending: List[str] = []
+        self._next_seq = 1
+        self._durable_seq = 0
+        self._snapshot_seq = 1
+        self._segment_start = 1
+        self._rotation_requested = False
+        self._closing = False
+        self._snapshotting = False
+        self._file = None
+        self._flusher = None
+        self._records_replayed = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def attach(self, clinic: Clinic) -> None:
+        if clinic._storage is not None:
+            raise ValueError("A journaled clinic keeps all records in memory and cannot use lazy storage")
+        self.recover(clinic)
+        self._clinic = clinic
+        self._segment_start = self._next_seq
+        self._file = self._open_segment(self._next_seq)
+        self._flusher = threading.Thread(target=self._flush_loop, name="clinic-journal", daemon=True)
+        self._flusher.start()
+        clinic.add_listener(self.handle_event)
+    
+    def close(self) -> None:
+        if self._flusher is None:
+            return
+        if self._clinic is not None:
+            self._clinic.remove_listener(self.handle_event)
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._flusher.join()
+        self._flusher = None
+        self._file.close()
+    
+    def get_records_replayed(self) -> int:
+        return self._records_replayed
+    
+    def get_durable_seq(self) -> int:
+        with self._condition:
+            return self._durable_seq
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self._directory, name)
+    
+    def _open_segment(self, start_seq: int):
+        return open(self._path(f"journal-{start_seq:012d}.log"), "a", encoding="utf-8")
+    
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for path in glob.glob(self._path(SEGMENT_PATTERN)):
+            start = os.path.basename(path)[len("journal-"):-len(".log")]
+            if start.isdigit():
+                segments.append((int(start), path))
+        return sorted(segments)
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        encoder = getattr(self, f"_encode_{event}", None)
+        if encoder is None:
+            return
+        payload = json.dumps([event] + encoder(subject), ensure_ascii=False, separators=(",", ":"))
+        
+        with self._condition:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending.append(f"[{seq},{payload[1:]}\n")
+            self._condition.notify_all()
+            if (seq - self._snapshot_seq >= self._snapshot_every and not self._snapshotting
+                    and self._clinic is not None):
+                self._snapshotting = True
+                threading.Thread(target=self.snapshot, name="clinic-snapshot", daemon=True).start()
+            if self._sync:
+                while self._durable_seq < seq and self._flusher is not None:
+                    self._condition.wait()
+    
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._rotation_requested and not self._closing:
+                    self._condition.wait()
+                batch, self._pending = self._pending, []
+                last_seq = self._next_seq - 1
+                rotate = self._rotation_requested
+                closing = self._closing
+            
+            if batch:
+                self._file.write("".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            if rotate:
+                self._file.close()
+                self._file = self._open_segment(last_seq + 1)
+            
+            with self._condition:
+                self._durable_seq = last_seq
+                if rotate:
+                    self._segment_start = last_seq + 1
+                    self._rotation_requested = False
+                self._condition.notify_all()
+                if closing and not self._pending and not self._rotation_requested:
+                    return
+    
+    def _rotate(self) -> int:
+        with self._condition:
+            if self._flusher is None or self._closing:
+                raise RuntimeError("Journal is not attached to a clinic")
+            self._rotation_requested = True
+            self._condition.notify_all()
+            while self._rotation_requested:
+                self._condition.wait()
+            return self._segment_start
+    
+    def _encode_patient_registered(self, patient: Patient) -> list:
+        registered_on = patient.get_registration_date()
+        return [patient.get_id(), patient.get_name(), patient.get_last_name(), patient.get_email(),
+                patient.get_phone(), patient.get_birth_date().isoformat(),
+                registered_on.isoformat() if registered_on else None]
+    
+    _encode_patient_updated = _encode_patient_registered
+    
+    def _encode_doctor_hired(self, doctor: Doctor) -> list:
+        return [doctor.get_id(), doctor.get_name(), doctor.get_last_name(), doctor.get_email(),
+                doctor.get_phone(), doctor.get_specialty(), doctor.get_consultation_fee()]
+    
+    _encode_doctor_updated = _encode_doctor_hired
+    
+    def _encode_working_hours_updated(self, doctor: Doctor) -> list:
+        return [doctor.get_id(), [[weekday, start.isoformat(), end.isoformat()]
+                                  for weekday in range(7) for start, end in doctor.get_working_hours(weekday)]]
+    
+    def _encode_room_added(self, room: ConsultingRoom) -> list:
+        return [room.get_number(), room.get_specialty()]
+    
+    def _encode_appointment_scheduled(self, appointment: Appointment) -> list:
+        room = appointment.get_room()
+        return [appointment.get_id(), appointment.get_doctor().get_id(), appointment.get_patient().get_id(),
+                appointment.get_date().isoformat(), appointment.get_time().isoformat(),
+                appointment.get_duration(), appointment.get_consultation_type(), appointment.get_status(),
+                room.get_number() if room is not None else None]
+    
+    def _encode_appointment_status(self, appointment: Appointment) -> list:
+        return [appointment.get_id(), appointment.get_doctor().get_id(), appointment.get_date().isoformat(),
+                appointment.get_status()]
+    
+    _encode_appointment_imported = _encode_appointment_scheduled
+    _encode_appointment_archived = _encode_appointment_scheduled
+    
+    _encode_appointment_confirmed = _encode_appointment_status
+    _encode_appointment_cancelled = _encode_appointment_status
+    _encode_appointment_rescheduled = _encode_appointment_status
+    
+    def _encode_consultation_added(self, consultation: Consultation) -> list:
+        return [consultation.get_id(), consultation.get_patient().get_id(), consultation.get_doctor().get_id(),
+                consultation.get_date().isoformat(), consultation.get_time().isoformat(),
+                consultation.get_diagnosis(), consultation.get_treatment(), consultation.calculate_fee()]
+    
+    def _encode_consultation_updated(self, consultation: Consultation) -> list:
+        return [consultation.get_id(), consultation.get_patient().get_id(), consultation.get_date().isoformat(),
+                consultation.get_diagnosis(), consultation.get_treatment()]
+    
+    def snapshot(self) -> int:
+        try:
+            seq = self._rotate()
+            clinic = self._clinic
+            temporary = self._path(SNAPSHOT_FILE + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as target:
+                target.write(json.dumps({'seq': seq}) + "\n")
+                batch = []
+                for event, subject in self._snapshot_records(clinic):
+                    batch.append([event] + getattr(self, f"_encode_{event}")(subject))
+                    if len(batch) >= SNAPSHOT_BATCH:
+                        target.write(json.dumps(batch, ensure_ascii=False, separators=(",", ":")) + "\n")
+                        batch = []
+                if batch:
+                    target.write(json.dumps(batch, ensure_ascii=False, separators=(",", ":")) + "\n")
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temporary, self._path(SNAPSHOT_FILE))
+            
+            for start, path in self._segments():
+                if start < seq:
+                    os.remove(path)
+            with self._condition:
+                self._snapshot_seq = seq
+            return seq
+        finally:
+            with self._condition:
+                self._snapshotting = False
+    
+    def _snapshot_records(self, clinic: Clinic) -> Iterator[Tuple[str, object]]:
+        for room in list(clinic._consulting_rooms):
+            yield "room_added", room
+        doctors = list(clinic._doctors)
+        for doctor in doctors:
+            yield "doctor_hired", doctor
+            yield "working_hours_updated", doctor
+        
+        registry = clinic._patients
+        with registry._lock:
+            patients = [registry._by_id[patient_id] for patient_id in registry._ordered_ids()]
+        for patient in patients:
+            yield "patient_registered", patient
+        for patient in patients:
+            for consultation in patient._medical_history or ():
+                yield "consultation_added", consultation
+        
+        for doctor in doctors:
+            with doctor._lock:
+                appointments = list(doctor._schedule)
+            for appointment in appointments:
+                yield "appointment_scheduled", appointment
+        for appointment in clinic._archive.get_appointments():
+            yield "appointment_archived", appointment
+    
+    def recover(self, clinic: Clinic) -> int:
+        replay = JournalReplay(clinic)
+        snapshot_seq = 1
+        snapshot_path = self._path(SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as source:
+                snapshot_seq = json.loads(source.readline())['seq']
+                for line in source:
+                    for record in json.loads(line):
+                        replay.apply(record)
+        
+        last_seq = snapshot_seq - 1
+        for start, path in self._segments():
+            for seq, record in self._read_segment(path):
+                if seq >= snapshot_seq:
+                    replay.apply(record[1:])
+                    last_seq = max(last_seq, seq)
+        
+        replay.finish()
+        self._records_replayed = replay.records
+        self._snapshot_seq = snapshot_seq
+        self._next_seq = last_seq + 1
+        self._durable_seq = last_seq
+        return replay.records
+    
+    def _read_segment(self, path: str) -> Iterator[Tuple[int, list]]:
+        valid_bytes = 0
+        with open(path, "rb") as source:
+            for line in source:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                yield record[0], record
+        if valid_bytes < os.path.getsize(path):
+            with open(path, "r+b") as target:
+                target.truncate(valid_bytes)
+
+class JournalReplay:
+    def __init__(self, clinic: Clinic):
+        self._clinic = clinic
+        self._rooms: Dict[int, ConsultingRoom] = {room.get_number(): room for room in clinic._consulting_rooms}
+        self._patients = 0
+        self._consultations = 0
+        self._revenue = 0.0
+        self._cancelled: List[Appointment] = []
+        self._archived: List[Appointment] = []
+        self._handlers: Dict[str, Callable] = {}
+        self.records = 0
+    
+    def apply(self, record: list) -> None:
+        event = record[0]
+        handler = self._handlers.get(event)
+        if handler is None:
+            handler = getattr(self, f"_replay_{event}", None)
+            if handler is None:
+                return
+            self._handlers[event] = handler
+        handler(*record[1:])
+        self.records += 1
+    
+    def finish(self) -> None:
+        self._clinic._metrics.add_loaded_totals(self._patients, self._consultations, self._revenue)
+        for doctor in self._clinic._doctors:
+            for appointment in doctor._schedule:
+                self._clinic._notify_loaded("appointment_loaded", appointment)
+        for appointment in self._cancelled:
+            self._clinic._notify_loaded("appointment_loaded", appointment)
+        self._clinic._archive.add(self._archived)
+        for appointment in self._archived:
+            self._clinic._notify_loaded("appointment_loaded", appointment)
+    
+    def _replay_patient_registered(self, patient_id: str, name: str, last_name: str, email: str, phone: str,
+                                   birth_date: str, registered_on: Optional[str] = None) -> None:
+        patient = Patient(patient_id, name, last_name, email, phone, date.fromisoformat(birth_date))
+        if registered_on:
+            patient._registered_on = date.fromisoformat(registered_on)
+        if self._clinic._patients._add(patient):
+            patient._clinic = self._clinic
+            self._patients += 1
+    
+    def _replay_patient_updated(self, patient_id: str, name: str, last_name: str, email: str, phone: str,
+                                birth_date: str, registered_on: Optional[str] = None) -> None:
+        patient = self._clinic.find_patient_by_id(patient_id)
+        if patient is not None:
+            patient._update(name, last_name, email, phone)
+            patient._birth_date = date.fromisoformat(birth_date)
+            patient._age_day = None
+    
+    def _replay_doctor_updated(self, doctor_id: str, name: str, last_name: str, email: str, phone: str,
+                               specialty: str, consultation_fee: float) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        if doctor is not None:
+            doctor._update(name, last_name, email, phone)
+    
+    def _replay_doctor_hired(self, doctor_id: str, name: str, last_name: str, email: str, phone: str,
+                             specialty: str, consultation_fee: float) -> None:
+        if self._clinic.find_doctor_by_id(doctor_id) is not None:
+            return
+        doctor = Doctor(doctor_id, name, last_name, email, phone, specialty, consultation_fee)
+        self._clinic._add_doctor(doctor)
+        self._clinic._notify_loaded("doctor_hired", doctor)
+    
+    def _replay_working_hours_updated(self, doctor_id: str, blocks: list) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        if doctor is None:
+            return
+        by_weekday: Dict[int, list] = {weekday: [] for weekday in range(7)}
+        for weekday, start, end in blocks:
+            by_weekday[weekday].append((time.fromisoformat(start), time.fromisoformat(end)))
+        for weekday, day_blocks in by_weekday.items():
+            doctor._apply_working_hours(weekday, day_blocks)
+    
+    def _replay_room_added(self, number: int, specialty: str) -> None:
+        if number in self._rooms:
+            return
+        room = self._rooms[number] = ConsultingRoom(number, specialty)
+        self._clinic._consulting_rooms.append(room)
+        self._clinic._room_scheduler.add_room(room)
+        self._clinic._notify_loaded("room_added", room)
+    
+    def _replay_appointment_scheduled(self, appointment_id: str, doctor_id: str, patient_id: str, day: str,
+                                      start_time: str, duration: int, consultation_type: str, status: str,
+                                      room: Optional[int]) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        patient = self._clinic.find_patient_by_id(patient_id)
+        if doctor is None or patient is None:
+            return
+        appointment = Appointment(appointment_id, date.fromisoformat(day), time.fromisoformat(start_time),
+                                  doctor, patient, consultation_type, duration)
+        appointment._status = status
+        if status in INACTIVE_STATUSES:
+            self._cancelled.append(appointment)
+            return
+        if not doctor._schedule._insert(appointment):
+            return
+        if room in self._rooms and self._clinic._room_scheduler.reserve_room(
+                self._rooms[room], appointment.get_date(), appointment.get_time(), duration):
+            appointment._room = self._rooms[room]
+    
+    _replay_appointment_imported = _replay_appointment_scheduled
+    
+    def _replay_appointment_archived(self, appointment_id: str, doctor_id: str, patient_id: str, day: str,
+                                     start_time: str, duration: int, consultation_type: str, status: str,
+                                     room: Optional[int]) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        patient = self._clinic.find_patient_by_id(patient_id)
+        if doctor is None or patient is None:
+            return
+        appointment = Appointment(appointment_id, date.fromisoformat(day), time.fromisoformat(start_time),
+                                  doctor, patient, consultation_type, duration)
+        appointment._status = status
+        appointment._room = self._rooms.get(room)
+        self._archived.append(appointment)
+    
+    def _replay_appointment_status(self, appointment_id: str, doctor_id: str, day: str, status: str) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        if doctor is None:
+            return
+        for appointment in doctor._schedule.get_appointments_by_date(date.fromisoformat(day)):
+            if appointment.get_id() == appointment_id:
+                appointment._status = status
+                if status == "Cancelled":
+                    doctor._release(appointment)
+                    self._cancelled.append(appointment)
+    
+    _replay_appointment_confirmed = _replay_appointment_status
+    _replay_appointment_cancelled = _replay_appointment_status
+    
+    def _replay_appointment_rescheduled(self, appointment_id: str, doctor_id: str, day: str, status: str) -> None:
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        if doctor is None:
+            return
+        for appointment in doctor._schedule.get_appointments_by_date(date.fromisoformat(day)):
+            if appointment.get_id() == appointment_id:
+                appointment._status = status
+                doctor._release(appointment)
+                return
+    
+    def _find_consultation(self, patient: Patient, consultation_id: str, day: date) -> Optional[Consultation]:
+        if patient._medical_history is None:
+            return None
+        for consultation in patient._medical_history.get_consultations_between(day, day):
+            if consultation.get_id() == consultation_id:
+                return consultation
+        return None
+    
+    def _replay_consultation_added(self, consultation_id: str, patient_id: str, doctor_id: str, day: str,
+                                   start_time: str, diagnosis: str, treatment: str, fee: float) -> None:
+        patient = self._clinic.find_patient_by_id(patient_id)
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        consultation_date = date.fromisoformat(day)
+        if patient is None or doctor is None or self._find_consultation(patient, consultation_id, consultation_date):
+            return
+        consultation = Consultation(consultation_id, consultation_date, time.fromisoformat(start_time),
+                                    doctor, patient)
+        consultation._diagnosis = diagnosis
+        consultation._treatment = treatment
+        consultation._applied_fee = fee
+        patient._get_history()._append(consultation)
+        doctor._record_fee(consultation)
+        self._consultations += 1
+        self._revenue += fee
+    
+    def _replay_consultation_updated(self, consultation_id: str, patient_id: str, day: str, diagnosis: str,
+                                     treatment: str) -> None:
+        patient = self._clinic.find_patient_by_id(patient_id)
+        if patient is None:
+            return
+        consultation = self._find_consultation(patient, consultation_id, date.fromisoformat(day))
+        if consultation is not None:
+            consultation._diagnosis = diagnosis
+            consultation._treatment = treatment
+
+def benchmark_restart(directory: str, patients: int = 1000000, tail: int = 10000) -> Dict:
+    clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    journal = ClinicJournal(directory, sync=False)
+    journal.attach(clinic)
+    doctor = Doctor("M001", "Benchmark", "Doctor", "doctor@clinic.com", "000000000", "General", 100.0)
+    clinic._add_doctor(doctor)
+    clinic._notify("doctor_hired", doctor)
+    
+    for i in range(patients - tail):
+        clinic._patients._add(Patient(f"P{i:07d}", "Patient", f"N{i}", f"patient{i}@mail.com", f"9{i:08d}",
+                                      date(1950 + i % 60, 1 + i % 12, 1 + i % 28)))
+    started = perf_counter()
+    journal.snapshot()
+    snapshot_seconds = perf_counter() - started
+    
+    started = perf_counter()
+    for i in range(patients - tail, patients):
+        clinic._register(Patient(f"P{i:07d}", "Patient", f"N{i}", f"patient{i}@mail.com", f"9{i:08d}",
+                                 date(1950 + i % 60, 1 + i % 12, 1 + i % 28)))
+    journal.close()
+    tail_seconds = perf_counter() - started
+    
+    restarted = Clinic("Marbella Clinic", "Lima, Peru")
+    started = perf_counter()
+    replayed = ClinicJournal(directory).recover(restarted)
+    restart_seconds = perf_counter() - started
+    
+    return {
+        'patients': len(restarted._patients),
+        'tail_records': tail,
+        'records_replayed': replayed,
+        'snapshot_seconds': round(snapshot_seconds, 3),
+        'tail_append_seconds': round(tail_seconds, 3),
+        'restart_seconds': round(restart_seconds, 3)
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="CliniSoft write-ahead journal")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    run = subparsers.add_parser("run", help="run the interactive menu on a journaled clinic")
+    run.add_argument("directory")
+    
+    snapshot = subparsers.add_parser("snapshot", help="write a snapshot and drop replayed journal segments")
+    snapshot.add_argument("directory")
+    
+    benchmark = subparsers.add_parser("benchmark", help="measure restart time for a large clinic")
+    benchmark.add_argument("directory")
+    benchmark.add_argument("--patients", type=int, default=1000000)
+    benchmark.add_argument("--tail", type=int, default=10000)
+    args = parser.parse_args(argv)
+    
+    if args.command == "benchmark":
+        print(json.dumps(benchmark_restart(args.directory, args.patients, args.tail), indent=2))
+        return
+    
+    clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    journal = ClinicJournal(args.directory)
+    started = perf_counter()
+    journal.attach(clinic)
+    print(f"✓ Recovered {journal.get_records_replayed()} records in {perf_counter() - started:.2f}s")
+    if args.command == "snapshot":
+        print(f"✓ Snapshot written at sequence {journal.snapshot()}")
+    else:
+        from Clinic_System import main_menu
+        main_menu(clinic)
+    journal.close()
+
+if __name__ == "__main__":
+    main()
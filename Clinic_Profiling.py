@@ -0,0 +1,205 @@
+import argparse
+import functools
+import json
+import math
+import threading
+from time import perf_counter
+from types import FunctionType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Clinic_System import AppointmentList, Clinic, Doctor, Secretary
+
+DEFAULT_TARGETS = (Clinic, Doctor, Secretary, AppointmentList)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_active_profiler = None
+_activation_lock = threading.Lock()
+
+class LatencyHistogram:
+    MIN_SECONDS = 1e-7
+    BUCKETS_PER_DOUBLING = 4
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, int] = {}
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+    
+    @classmethod
+    def _bucket(cls, seconds: float) -> int:
+        if seconds <= cls.MIN_SECONDS:
+            return 0
+        return math.ceil(math.log2(seconds / cls.MIN_SECONDS) * cls.BUCKETS_PER_DOUBLING)
+    
+    @classmethod
+    def upper_bound(cls, bucket: int) -> float:
+        return cls.MIN_SECONDS * 2 ** (bucket / cls.BUCKETS_PER_DOUBLING)
+    
+    @classmethod
+    def ladder(cls, max_seconds: float) -> range:
+        return range(0, cls._bucket(max_seconds) + cls.BUCKETS_PER_DOUBLING, cls.BUCKETS_PER_DOUBLING)
+    
+    def record(self, seconds: float) -> None:
+        bucket = self._bucket(seconds)
+        with self._lock:
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets = {}
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+    
+    def get_count(self) -> int:
+        return self._count
+    
+    def get_buckets(self) -> List[Tuple[float, int]]:
+        with self._lock:
+            return [(self.upper_bound(bucket), self._buckets[bucket]) for bucket in sorted(self._buckets)]
+    
+    def get_cumulative_counts(self, buckets: Iterable[int]) -> List[int]:
+        with self._lock:
+            counts = sorted(self._buckets.items())
+        cumulative = 0
+        position = 0
+        totals = []
+        for bucket in buckets:
+            while position < len(counts) and counts[position][0] <= bucket:
+                cumulative += counts[position][1]
+                position += 1
+            totals.append(cumulative)
+        return totals
+    
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = q * self._count
+            seen = 0
+            for bucket in sorted(self._buckets):
+                seen += self._buckets[bucket]
+                if seen >= rank:
+                    return min(self.upper_bound(bucket), self._max)
+            return self._max
+    
+    def to_dict(self) -> Dict:
+        with self._lock:
+            summary = {
+                'count': self._count,
+                'total_seconds': round(self._sum, 6),
+                'mean_ms': round(self._sum / self._count * 1000, 4) if self._count else 0.0,
+                'max_ms': round(self._max * 1000, 4)
+            }
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}_ms"] = round(self.quantile(q) * 1000, 4)
+        return summary
+
+PROMETHEUS_MAX_SECONDS = 10.0
+PROMETHEUS_BUCKETS = LatencyHistogram.ladder(PROMETHEUS_MAX_SECONDS)
+
+class OperationProfiler:
+    def __init__(self, targets: Iterable[type] = DEFAULT_TARGETS):
+        self._targets = tuple(targets)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._originals: List[Tuple[type, str, Callable]] = []
+    
+    def is_enabled(self) -> bool:
+        return bool(self._originals)
+    
+    def enable(self) -> None:
+        global _active_profiler
+        with _activation_lock:
+            if _active_profiler is self:
+                return
+            if _active_profiler is not None:
+                raise RuntimeError("Another profiler is already instrumenting the clinic")
+            for cls in self._targets:
+                for name, method in list(vars(cls).items()):
+                    if name.startswith("_") or not isinstance(method, FunctionType):
+                        continue
+                    self._originals.append((cls, name, method))
+                    setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", method))
+            _active_profiler = self
+    
+    def disable(self) -> None:
+        global _active_profiler
+        with _activation_lock:
+            if _active_profiler is not self:
+                return
+            for cls, name, method in reversed(self._originals):
+                setattr(cls, name, method)
+            self._originals = []
+            _active_profiler = None
+    
+    def __enter__(self) -> 'OperationProfiler':
+        self.enable()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+    
+    def _wrap(self, operation: str, method: Callable) -> Callable:
+        histogram = self._histograms.get(operation)
+        if histogram is None:
+            histogram = self._histograms[operation] = LatencyHistogram()
+        
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.record(perf_counter() - started)
+        return timed
+    
+    def get_histogram(self, operation: str) -> Optional[LatencyHistogram]:
+        return self._histograms.get(operation)
+    
+    def reset(self) -> None:
+        for histogram in self._histograms.values():
+            histogram.clear()
+    
+    def to_dict(self) -> Dict:
+        return {operation: histogram.to_dict()
+                for operation, histogram in sorted(self._histograms.items()) if histogram.get_count()}
+    
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+    
+    def to_prometheus(self, metric: str = "clinisoft_operation_duration_seconds") -> str:
+        lines = [f"# HELP {metric} Latency of CliniSoft operations.", f"# TYPE {metric} histogram"]
+        bounds = [LatencyHistogram.upper_bound(bucket) for bucket in PROMETHEUS_BUCKETS]
+        for operation, histogram in sorted(self._histograms.items()):
+            for bound, cumulative in zip(bounds, histogram.get_cumulative_counts(PROMETHEUS_BUCKETS)):
+                lines.append(f'{metric}_bucket{{operation="{operation}",le="{bound:.6g}"}} {cumulative}')
+            summary = histogram.to_dict()
+            lines.append(f'{metric}_bucket{{operation="{operation}",le="+Inf"}} {summary["count"]}')
+            lines.append(f'{metric}_sum{{operation="{operation}"}} {summary["total_seconds"]}')
+            lines.append(f'{metric}_count{{operation="{operation}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+def get_active_profiler() -> Optional[OperationProfiler]:
+    return _active_profiler
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Profile CliniSoft operations on a synthetic workload")
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--format", choices=["json", "prometheus"], default="json")
+    args = parser.parse_args(argv)
+    
+    from Clinic_Benchmark import benchmark_operations
+    with OperationProfiler() as profiler:
+        benchmark_operations(args.patients, max(10, args.patients // 1000))
+    if args.format == "json":
+        print(profiler.to_json())
+    else:
+        print(profiler.to_prometheus(), end="")
+
+if __name__ == "__main__":
+    main()
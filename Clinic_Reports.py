@@ -0,0 +1,209 @@
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+import json
+import math
+import os
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from Clinic_System import Clinic, Doctor
+
+class DoctorLedger(NamedTuple):
+    doctor_id: str
+    doctor: str
+    specialty: str
+    days: array
+    totals: array
+    counts: array
+
+class ClinicSnapshot:
+    def __init__(self, doctors: List[DoctorLedger], taken_at: datetime):
+        self._doctors = doctors
+        self._taken_at = taken_at
+    
+    @classmethod
+    def take(cls, clinic: Clinic) -> 'ClinicSnapshot':
+        doctors = sorted(list(clinic._doctors), key=Doctor.get_id)
+        with ExitStack() as locks:
+            for doctor in doctors:
+                locks.enter_context(doctor._lock)
+            taken_at = datetime.now()
+            ledgers = [(doctor, doctor._ledger.share()) for doctor in doctors]
+        
+        return cls([DoctorLedger(doctor.get_id(), doctor.get_full_name(), doctor.get_specialty(), *columns)
+                    for doctor, columns in ledgers], taken_at)
+    
+    def get_doctors(self) -> List[DoctorLedger]:
+        return self._doctors
+    
+    def get_taken_at(self) -> datetime:
+        return self._taken_at
+    
+    def __len__(self) -> int:
+        return len(self._doctors)
+
+def _month_starts(start: int, end: int) -> List[Tuple[str, int]]:
+    day = date.fromordinal(start)
+    months = []
+    while day.toordinal() <= end:
+        months.append((f"{day.year}-{day.month:02d}", max(start, day.replace(day=1).toordinal())))
+        day = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return months
+
+def _report_batch(ledgers: List[DoctorLedger], start: int, end: int,
+                  period: str) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    doctors = {}
+    specialties = {}
+    months = _month_starts(start, end)
+    for ledger in ledgers:
+        first = bisect_left(ledger.days, start)
+        last = bisect_right(ledger.days, end)
+        totals = ledger.totals[first:last]
+        payment = round(math.fsum(totals), 2)
+        consultations = sum(ledger.counts[first:last])
+        busiest = first + totals.index(max(totals)) if totals else None
+        
+        monthly = {}
+        boundaries = [bisect_left(ledger.days, month_start, first, last) for _, month_start in months] + [last]
+        for (month, _), low, high in zip(months, boundaries, boundaries[1:]):
+            if high > low:
+                monthly[month] = round(math.fsum(ledger.totals[low:high]), 2)
+        
+        doctors[ledger.doctor_id] = {
+            'doctor': ledger.doctor,
+            'specialty': ledger.specialty,
+            'consultations': consultations,
+            'payment': payment,
+            'period': period,
+            'active_days': last - first,
+            'average_fee': round(payment / consultations, 2) if consultations else 0.0,
+            'busiest_day': date.fromordinal(ledger.days[busiest]).isoformat() if busiest is not None else None,
+            'monthly': monthly
+        }
+        
+        summary = specialties.setdefault(ledger.specialty, {'doctors': 0, 'active_doctors': 0,
+                                                            'consultations': 0, 'payment': 0.0})
+        summary['doctors'] += 1
+        summary['active_doctors'] += 1 if consultations else 0
+        summary['consultations'] += consultations
+        summary['payment'] += payment
+    return doctors, specialties
+
+def _merge_specialties(target: Dict[str, Dict], partial: Dict[str, Dict]) -> None:
+    for specialty, summary in partial.items():
+        merged = target.setdefault(specialty, {'doctors': 0, 'active_doctors': 0, 'consultations': 0,
+                                               'payment': 0.0})
+        for field, value in summary.items():
+            merged[field] += value
+
+class ReportRunner:
+    def __init__(self, workers: Optional[int] = None, batch_size: int = 500):
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._batch_size = batch_size
+        self._executor = None
+    
+    def __enter__(self) -> 'ReportRunner':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
+    
+    def run(self, source, start_date: date, end_date: date) -> Dict:
+        snapshot = source if isinstance(source, ClinicSnapshot) else ClinicSnapshot.take(source)
+        ledgers = snapshot.get_doctors()
+        period = f"{start_date} to {end_date}"
+        batches = [ledgers[i:i + self._batch_size] for i in range(0, len(ledgers), self._batch_size)]
+        arguments = (start_date.toordinal(), end_date.toordinal(), period)
+        
+        if self._workers > 1 and len(batches) > 1:
+            executor = self._get_executor()
+            results = [future.result() for future in
+                       [executor.submit(_report_batch, batch, *arguments) for batch in batches]]
+        else:
+            results = [_report_batch(batch, *arguments) for batch in batches]
+        
+        doctors = {}
+        specialties = {}
+        for doctor_reports, specialty_reports in results:
+            doctors.update(doctor_reports)
+            _merge_specialties(specialties, specialty_reports)
+        for summary in specialties.values():
+            summary['payment'] = round(summary['payment'], 2)
+            summary['average_payment'] = round(summary['payment'] / summary['doctors'], 2)
+        
+        return {
+            'period': period,
+            'snapshot_taken_at': snapshot.get_taken_at().isoformat(timespec="seconds"),
+            'doctors': doctors,
+            'specialties': specialties,
+            'total_payment': round(math.fsum(summary['payment'] for summary in specialties.values()), 2),
+            'total_consultations': sum(summary['consultations'] for summary in specialties.values())
+        }
+    
+    def payment_reports(self, source, start_date: date, end_date: date) -> Dict:
+        return self.run(source, start_date, end_date)['doctors']
+
+def build_ledgers(clinic: Clinic, doctors: int, days: int, start_day: date) -> None:
+    specialties = ["Cardiology", "Urology", "Pediatrics", "Dermatology", "General"]
+    for i in range(doctors):
+        doctor = Doctor(f"M{i:05d}", "Doctor", f"N{i}", "doctor@clinic.com", "000000000",
+                        specialties[i % len(specialties)], 100.0)
+        clinic.hire_doctor(doctor)
+        for offset in range(days):
+            count = (i + offset) % 12
+            if count:
+                doctor._ledger.add(start_day + timedelta(days=offset), count * 100.0, count)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate CliniSoft payment reports in parallel")
+    parser.add_argument("--doctors", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    
+    clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    start_day = date(2023, 1, 1)
+    build_ledgers(clinic, args.doctors, args.days, start_day)
+    end_day = start_day + timedelta(days=args.days - 1)
+    
+    started = perf_counter()
+    serial = clinic.generate_payment_reports(start_day, end_day)
+    serial_seconds = perf_counter() - started
+    
+    with ReportRunner(args.workers, args.batch_size) as runner:
+        started = perf_counter()
+        snapshot = ClinicSnapshot.take(clinic)
+        snapshot_seconds = perf_counter() - started
+        report = runner.run(snapshot, start_day, end_day)
+        parallel_seconds = perf_counter() - started
+    
+    mismatches = sum(serial[doctor_id]['payment'] != entry['payment']
+                     for doctor_id, entry in report['doctors'].items())
+    print(json.dumps({
+        'doctors': args.doctors,
+        'days': args.days,
+        'workers': args.workers,
+        'serial_seconds': round(serial_seconds, 3),
+        'snapshot_ms': round(snapshot_seconds * 1000, 2),
+        'parallel_seconds': round(parallel_seconds, 3),
+        'payment_mismatches': mismatches,
+        'specialties': report['specialties']
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from http import HTTPStatus
+import json
+import logging
+import re
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from Clinic_Profiling import OperationProfiler, get_active_profiler
+from Clinic_System import DEFAULT_APPOINTMENT_MINUTES, Appointment, Clinic, Patient, appointment_ids
+
+logger = logging.getLogger("clinisoft.api")
+
+Response = Tuple[int, object]
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ClinicApi:
+    MAX_BODY_BYTES = 1024 * 1024
+    MAX_SLOT_RANGE_DAYS = 31
+    
+    def __init__(self, clinic: Clinic, workers: int = 8):
+        self._clinic = clinic
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clinisoft-api")
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = [
+            ("GET", re.compile(r"/patients"), self._search_patients),
+            ("POST", re.compile(r"/patients"), self._register_patient),
+            ("GET", re.compile(r"/patients/(?P<patient_id>[^/]+)"), self._get_patient),
+            ("GET", re.compile(r"/doctors"), self._list_doctors),
+            ("GET", re.compile(r"/doctors/(?P<doctor_id>[^/]+)/appointments"), self._get_doctor_appointments),
+            ("POST", re.compile(r"/appointments"), self._schedule_appointment),
+            ("GET", re.compile(r"/slots"), self._find_slots),
+            ("GET", re.compile(r"/metrics"), self._get_metrics),
+        ]
+        self._requests = 0
+        self._errors = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+    
+    def _search_patients(self, query: Dict, body: Dict) -> Response:
+        name = query.get("name", "")
+        limit = _parse_int(query.get("limit", "20"), "limit")
+        patients = self._clinic.find_patient_by_name(name, limit)
+        return HTTPStatus.OK, [patient.to_dict() for patient in patients]
+    
+    def _register_patient(self, query: Dict, body: Dict) -> Response:
+        patient = Patient(_required(body, "id"), _required(body, "name"), _required(body, "last_name"),
+                          body.get("email", ""), body.get("phone", ""),
+                          _parse_date(_required(body, "birth_date"), "birth_date"))
+        if not self._clinic.register_patient(patient):
+            raise ApiError(HTTPStatus.CONFLICT, f"Patient {patient.get_id()} already exists")
+        return HTTPStatus.CREATED, patient.to_dict()
+    
+    def _get_patient(self, query: Dict, body: Dict, patient_id: str) -> Response:
+        patient = self._clinic.find_patient_by_id(patient_id)
+        if patient is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Patient {patient_id} not found")
+        return HTTPStatus.OK, patient.to_dict()
+    
+    def _list_doctors(self, query: Dict, body: Dict) -> Response:
+        specialty = query.get("specialty")
+        doctors = [doctor.to_dict() for doctor in self._clinic._doctors
+                   if specialty is None or doctor.get_specialty() == specialty]
+        return HTTPStatus.OK, doctors
+    
+    def _get_doctor_appointments(self, query: Dict, body: Dict, doctor_id: str) -> Response:
+        doctor = self._find_doctor(doctor_id)
+        day = _parse_date(query.get("date", date.today().isoformat()), "date")
+        return HTTPStatus.OK, [appointment.to_dict() for appointment in doctor.get_daily_appointments(day)]
+    
+    def _schedule_appointment(self, query: Dict, body: Dict) -> Response:
+        doctor = self._find_doctor(_required(body, "doctor_id"))
+        patient = self._clinic.find_patient_by_id(_required(body, "patient_id"))
+        if patient is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Patient {body['patient_id']} not found")
+        
+        duration = _parse_int(body.get("duration", DEFAULT_APPOINTMENT_MINUTES), "duration")
+        if duration <= 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Field 'duration' must be positive")
+        appointment = Appointment(appointment_ids.next_id(), _parse_date(_required(body, "date"), "date"),
+                                  _parse_time(_required(body, "time"), "time"), doctor, patient,
+                                  body.get("consultation_type", "General consultation"), duration)
+        if not doctor.schedule_appointment(appointment):
+            raise ApiError(HTTPStatus.CONFLICT, "Doctor not available at that time")
+        return HTTPStatus.CREATED, appointment.to_dict()
+    
+    def _find_slots(self, query: Dict, body: Dict) -> Response:
+        specialty = _required(query, "specialty")
+        start = _parse_datetime(query.get("from"), "from") if query.get("from") else datetime.now()
+        max_range = timedelta(days=self.MAX_SLOT_RANGE_DAYS)
+        end = _parse_datetime(query["to"], "to") if query.get("to") else start + max_range
+        if end - start > max_range:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Range 'from'-'to' must not exceed {self.MAX_SLOT_RANGE_DAYS} days")
+        duration = _parse_int(query.get("duration", DEFAULT_APPOINTMENT_MINUTES), "duration")
+        count = _parse_int(query.get("count", 5), "count")
+        if duration <= 0 or count <= 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Fields 'duration' and 'count' must be positive")
+        
+        slots = self._clinic.find_available_slots(specialty, start, end, duration, count)
+        return HTTPStatus.OK, [{'doctor_id': slot.doctor.get_id(), 'doctor': slot.doctor.get_full_name(),
+                                'start': slot.start.isoformat(timespec="minutes"), 'duration': slot.duration_minutes}
+                               for slot in slots]
+    
+    def _get_metrics(self, query: Dict, body: Dict) -> Response:
+        metrics = dict(self._clinic.get_operational_metrics())
+        metrics['api'] = {
+            'requests': self._requests,
+            'errors': self._errors,
+            'mean_latency_ms': round(self._total_latency / self._requests * 1000, 3) if self._requests else 0.0,
+            'max_latency_ms': round(self._max_latency * 1000, 3)
+        }
+        profiler = get_active_profiler()
+        if profiler is not None:
+            metrics['operations'] = profiler.to_dict()
+        return HTTPStatus.OK, metrics
+    
+    def _find_doctor(self, doctor_id: str):
+        doctor = self._clinic.find_doctor_by_id(doctor_id)
+        if doctor is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Doctor {doctor_id} not found")
+        return doctor
+    
+    def _route(self, method: str, path: str) -> Tuple[Callable, Dict]:
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, match.groupdict()
+            path_matched = True
+        if path_matched:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+    
+    async def dispatch(self, method: str, target: str, body: bytes) -> Response:
+        try:
+            url = urlsplit(target)
+            handler, params = self._route(method, url.path.rstrip("/") or "/")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: handler(query, payload, **params))
+        except ApiError as error:
+            return error.status, {'error': error.message}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return HTTPStatus.BAD_REQUEST, {'error': "Request body is not valid JSON"}
+        except Exception:
+            logger.exception("Unhandled error for %s %s", method, target)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Internal server error"}
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                
+                started = perf_counter()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed request line"}, False)
+                    break
+                
+                headers = await _read_headers(reader)
+                length = int(headers.get("content-length", "0") or 0)
+                if length > self.MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                
+                status, payload = await self.dispatch(method.upper(), target, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                self._record(method, target, status, perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: object, keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    
+    def _record(self, method: str, target: str, status: int, latency: float) -> None:
+        self._requests += 1
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+        if status >= 400:
+            self._errors += 1
+        logger.info("%s %s %d %.2fms", method, target, status, latency * 1000)
+    
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info("CliniSoft API listening on %s", ", ".join(str(sock.getsockname()) for sock in server.sockets))
+        async with server:
+            await server.serve_forever()
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+def _required(body: Dict, field: str) -> str:
+    value = body.get(field)
+    if value is None or str(value).strip() == "":
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing field '{field}'")
+    return str(value).strip()
+
+def _parse_date(value: str, field: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Field '{field}' must be YYYY-MM-DD")
+
+def _parse_time(value: str, field: str) -> time:
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Field '{field}' must be HH:MM")
+
+def _parse_datetime(value: str, field: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Field '{field}' must be an ISO date or datetime")
+
+def _parse_int(value: object, field: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Field '{field}' must be an integer")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="CliniSoft HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--database", help="SQLite database (in-memory clinic when omitted)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--log-operations", action="store_true", help="also log every clinic operation")
+    parser.add_argument("--profile", action="store_true", help="record per-operation latency histograms")
+    args = parser.parse_args(argv)
+    
+    if args.profile:
+        OperationProfiler().enable()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    logging.getLogger("clinisoft").setLevel(logging.INFO if args.log_operations else logging.WARNING)
+    logger.setLevel(logging.INFO)
+    storage = None
+    if args.database:
+        from Clinic_Storage import SQLiteStorage
+        storage = SQLiteStorage(args.database)
+    clinic = Clinic("Marbella Clinic", "Lima, Peru", storage)
+    api = ClinicApi(clinic, args.workers)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+        clinic.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import heapq
+import itertools
+import json
+import multiprocessing
+import threading
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import zlib
+
+from Clinic_System import Clinic, NameIndex, Patient, normalize_name
+
+PARTITIONS = ("hash", "branch")
+
+class ShardError(Exception):
+    def __init__(self, branch: str, message: str):
+        super().__init__(f"Shard {branch}: {message}")
+        self.branch = branch
+        self.message = message
+
+class ShardWorker:
+    def __init__(self, clinic: Clinic):
+        self._clinic = clinic
+    
+    def register_patients(self, records: List[Dict]) -> List[bool]:
+        results = []
+        with self._clinic.transaction():
+            for record in records:
+                patient = Patient(record['id'], record['name'], record['last_name'], record.get('email', ""),
+                                  record.get('phone', ""), date.fromisoformat(record['birth_date']))
+                results.append(self._clinic._register(patient))
+        return results
+    
+    def find_patient_by_id(self, patient_id: str) -> Optional[Dict]:
+        patient = self._clinic.find_patient_by_id(patient_id)
+        return patient.to_dict() if patient is not None else None
+    
+    def find_existing_ids(self, patient_ids: List[str]) -> List[str]:
+        return [patient_id for patient_id in patient_ids if self._clinic.find_patient_by_id(patient_id) is not None]
+    
+    def find_patient_by_name(self, name: str, limit: Optional[int]) -> List[Tuple[int, str, str, Dict]]:
+        query = normalize_name(name)
+        return [(NameIndex._rank(patient.get_normalized_name(), query), patient.get_normalized_name(),
+                 patient.get_id(), patient.to_dict())
+                for patient in self._clinic.find_patient_by_name(name, limit)]
+    
+    def count_patients(self) -> int:
+        return len(self._clinic._patients)
+    
+    def get_operational_metrics(self) -> Dict:
+        return self._clinic.get_operational_metrics()
+
+def _serve_shard(connection, branch: str, database: Optional[str]) -> None:
+    storage = None
+    if database:
+        from Clinic_Storage import SQLiteStorage
+        storage = SQLiteStorage(database)
+    clinic = Clinic(f"Marbella Clinic - {branch}", branch, storage)
+    worker = ShardWorker(clinic)
+    
+    while True:
+        try:
+            method, args = connection.recv()
+        except EOFError:
+            break
+        if method == "close":
+            break
+        try:
+            connection.send((True, getattr(worker, method)(*args)))
+        except Exception as error:
+            connection.send((False, f"{type(error).__name__}: {error}"))
+    
+    clinic.close()
+    connection.close()
+
+class ClinicShard:
+    def __init__(self, branch: str, database: Optional[str] = None):
+        self._branch = branch
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve_shard, args=(child, branch, database),
+                                                name=f"clinic-shard-{branch}", daemon=True)
+        self._process.start()
+        child.close()
+        self._lock = threading.Lock()
+    
+    def get_branch(self) -> str:
+        return self._branch
+    
+    def call(self, method: str, *args):
+        with self._lock:
+            self._connection.send((method, args))
+            ok, result = self._connection.recv()
+        if not ok:
+            raise ShardError(self._branch, result)
+        return result
+    
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._connection.send(("close", ()))
+            except (BrokenPipeError, OSError):
+                pass
+            self._connection.close()
+        self._process.join()
+
+class ShardDirectory:
+    def __init__(self, branches: List[str], partition: str = "hash", databases: Optional[List[str]] = None):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown partition scheme: {partition}")
+        if not branches:
+            raise ValueError("A sharded clinic needs at least one branch")
+        self._partition = partition
+        self._shards = [ClinicShard(branch, databases[i] if databases else None)
+                        for i, branch in enumerate(branches)]
+        self._by_branch = {shard.get_branch(): shard for shard in self._shards}
+        self._locations: Dict[str, ClinicShard] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self._shards), thread_name_prefix="clinic-directory")
+    
+    def __enter__(self) -> 'ShardDirectory':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        self._executor.shutdown()
+        for shard in self._shards:
+            shard.close()
+    
+    def get_branches(self) -> List[str]:
+        return [shard.get_branch() for shard in self._shards]
+    
+    def _route(self, patient_id: str, branch: Optional[str]) -> ClinicShard:
+        if self._partition == "hash":
+            return self._shards[zlib.crc32(patient_id.encode("utf-8")) % len(self._shards)]
+        if branch not in self._by_branch:
+            raise ValueError(f"Unknown branch: {branch}")
+        return self._by_branch[branch]
+    
+    def _fan_out(self, method: str, *args) -> List:
+        futures = [self._executor.submit(shard.call, method, *args) for shard in self._shards]
+        return [future.result() for future in futures]
+    
+    def register_patient(self, record: Dict, branch: Optional[str] = None) -> bool:
+        return self.register_patients([record], branch) == 1
+    
+    def _locate(self, patient_ids: List[str]) -> Set[str]:
+        with self._lock:
+            unknown = [patient_id for patient_id in patient_ids if patient_id not in self._locations]
+        located = set(patient_ids).difference(unknown)
+        if unknown:
+            for shard, found in zip(self._shards, self._fan_out("find_existing_ids", unknown)):
+                with self._lock:
+                    for patient_id in found:
+                        self._locations[patient_id] = shard
+                located.update(found)
+        return located
+    
+    def register_patients(self, records: Iterable[Dict], branch: Optional[str] = None) -> int:
+        records = list(records)
+        existing = self._locate([record['id'] for record in records]) if self._partition == "branch" else set()
+        batches: Dict[ClinicShard, List[Dict]] = {}
+        for record in records:
+            if record['id'] in existing:
+                continue
+            batches.setdefault(self._route(record['id'], branch), []).append(record)
+        
+        futures = {shard: self._executor.submit(shard.call, "register_patients", batch)
+                   for shard, batch in batches.items()}
+        registered = 0
+        for shard, future in futures.items():
+            for record, added in zip(batches[shard], future.result()):
+                if added:
+                    registered += 1
+                    if self._partition == "branch":
+                        with self._lock:
+                            self._locations[record['id']] = shard
+        return registered
+    
+    def find_patient_by_id(self, patient_id: str) -> Optional[Dict]:
+        if self._partition == "hash":
+            shard = self._route(patient_id, None)
+            record = shard.call("find_patient_by_id", patient_id)
+            return dict(record, branch=shard.get_branch()) if record is not None else None
+        
+        with self._lock:
+            shard = self._locations.get(patient_id)
+        if shard is not None:
+            record = shard.call("find_patient_by_id", patient_id)
+            if record is not None:
+                return dict(record, branch=shard.get_branch())
+        
+        for shard, record in zip(self._shards, self._fan_out("find_patient_by_id", patient_id)):
+            if record is not None:
+                with self._lock:
+                    self._locations[patient_id] = shard
+                return dict(record, branch=shard.get_branch())
+        return None
+    
+    def find_patient_by_name(self, name: str, limit: Optional[int] = None) -> List[Dict]:
+        results = self._fan_out("find_patient_by_name", name, limit)
+        merged = heapq.merge(*[[(rank, normalized, patient_id, branch, record)
+                                for rank, normalized, patient_id, record in matches]
+                               for branch, matches in zip(self.get_branches(), results)])
+        return [dict(record, branch=branch)
+                for _, _, _, branch, record in itertools.islice(merged, limit)]
+    
+    def count_patients(self) -> Dict[str, int]:
+        return dict(zip(self.get_branches(), self._fan_out("count_patients")))
+    
+    def get_operational_metrics(self) -> Dict[str, Dict]:
+        return dict(zip(self.get_branches(), self._fan_out("get_operational_metrics")))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local sharded CliniSoft deployment")
+    parser.add_argument("--branches", nargs="+", default=["Lima", "Arequipa", "Cusco", "Trujillo"])
+    parser.add_argument("--partition", choices=PARTITIONS, default="hash")
+    parser.add_argument("--databases", nargs="+", help="one SQLite database per branch (in memory when omitted)")
+    parser.add_argument("--patients", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args(argv)
+    
+    from Clinic_Benchmark import generate_patients
+    records = [patient.to_dict() for patient in generate_patients(args.patients)]
+    branches = args.branches
+    
+    with ShardDirectory(branches, args.partition, args.databases) as directory:
+        started = perf_counter()
+        if args.partition == "hash":
+            registered = directory.register_patients(records)
+        else:
+            registered = sum(directory.register_patients(records[i::len(branches)], branch)
+                             for i, branch in enumerate(branches))
+        register_seconds = perf_counter() - started
+        
+        step = max(1, len(records) // args.lookups)
+        started = perf_counter()
+        found = sum(directory.find_patient_by_id(record['id']) is not None for record in records[::step])
+        lookup_seconds = perf_counter() - started
+        
+        started = perf_counter()
+        matches = directory.find_patient_by_name("ana perez", 10)
+        search_seconds = perf_counter() - started
+        
+        print(json.dumps({
+            'branches': directory.count_patients(),
+            'partition': args.partition,
+            'registered': registered,
+            'register_seconds': round(register_seconds, 3),
+            'lookups': len(records[::step]),
+            'found': found,
+            'lookup_ms': round(lookup_seconds / max(1, len(records[::step])) * 1000, 3),
+            'name_search_ms': round(search_seconds * 1000, 3),
+            'top_matches': [f"{match['name']} {match['last_name']} ({match['branch']})" for match in matches]
+        }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
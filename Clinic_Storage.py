@@ -0,0 +1,448 @@
+from contextlib import contextmanager
+from datetime import date, time
+import sqlite3
+import sys
+import threading
+from typing import Iterator, List, Optional
+
+from Clinic_System import (INACTIVE_STATUSES, Appointment, Clinic, Consultation, ConsultingRoom, Doctor, Patient,
+                           minute_of_day, normalize_name)
+
+class ClinicStorage:
+    def load_into(self, clinic: Clinic) -> None:
+        raise NotImplementedError("Abstract method")
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        raise NotImplementedError("Abstract method")
+    
+    def has_patient(self, patient_id: str) -> bool:
+        raise NotImplementedError("Abstract method")
+    
+    def has_appointment(self, appointment_id: str) -> bool:
+        raise NotImplementedError("Abstract method")
+    
+    def has_slot(self, doctor_id: str, day: date, start_minute: int, end_minute: int) -> bool:
+        raise NotImplementedError("Abstract method")
+    
+    def get_loaded_from(self) -> Optional[date]:
+        return None
+    
+    def count_patients(self) -> int:
+        raise NotImplementedError("Abstract method")
+    
+    def load_patient(self, patient_id: str, clinic: Clinic) -> Optional[Patient]:
+        raise NotImplementedError("Abstract method")
+    
+    def load_patients(self, patient_ids: List[str], clinic: Clinic) -> List[Patient]:
+        raise NotImplementedError("Abstract method")
+    
+    def iter_patient_ids(self, batch_size: int = 1000, order_by: str = "id",
+                         after: Optional[str] = None) -> Iterator[str]:
+        raise NotImplementedError("Abstract method")
+    
+    def iter_patients(self, clinic: Clinic, batch_size: int = 1000) -> Iterator[Patient]:
+        raise NotImplementedError("Abstract method")
+    
+    def search_patient_ids(self, name: str, limit: Optional[int] = None) -> List[str]:
+        raise NotImplementedError("Abstract method")
+    
+    def transaction(self):
+        raise NotImplementedError("Abstract method")
+    
+    def close(self) -> None:
+        pass
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    registered_on TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (normalized_name);
+
+CREATE TABLE IF NOT EXISTS doctors (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    consultation_fee REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS doctor_hours (
+    doctor_id TEXT NOT NULL REFERENCES doctors (id),
+    weekday INTEGER NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_doctor_hours ON doctor_hours (doctor_id, weekday);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    number INTEGER PRIMARY KEY,
+    specialty TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    id TEXT NOT NULL,
+    doctor_id TEXT NOT NULL REFERENCES doctors (id),
+    patient_id TEXT NOT NULL REFERENCES patients (id),
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    consultation_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    room INTEGER REFERENCES rooms (number)
+);
+CREATE INDEX IF NOT EXISTS idx_appointments_id ON appointments (id);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor ON appointments (doctor_id, date, time);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments (patient_id, date);
+
+CREATE TABLE IF NOT EXISTS consultations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    patient_id TEXT NOT NULL REFERENCES patients (id),
+    doctor_id TEXT NOT NULL REFERENCES doctors (id),
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    diagnosis TEXT NOT NULL,
+    treatment TEXT NOT NULL,
+    fee REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_consultations_patient ON consultations (patient_id, seq);
+CREATE INDEX IF NOT EXISTS idx_consultations_doctor ON consultations (doctor_id, date);
+"""
+
+NAME_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS patient_names
+USING fts5 (id UNINDEXED, normalized_name, tokenize = 'trigram');
+"""
+
+class SQLiteStorage(ClinicStorage):
+    def __init__(self, path: str = ":memory:", load_appointments_from: Optional[date] = None):
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._load_appointments_from = load_appointments_from
+        self._loaded_from = None
+        self._connection.executescript(SCHEMA)
+        self._migrate()
+        self._name_search = self._create_name_search()
+    
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(appointments)")}
+        if "room" not in columns:
+            self._connection.execute("ALTER TABLE appointments ADD COLUMN room INTEGER REFERENCES rooms (number)")
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(patients)")}
+        if "registered_on" not in columns:
+            self._connection.execute("ALTER TABLE patients ADD COLUMN registered_on TEXT")
+    
+    def _create_name_search(self) -> bool:
+        try:
+            self._connection.executescript(NAME_SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        return True
+    
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._connection.execute("BEGIN")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            else:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._connection.execute("COMMIT")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        handler = getattr(self, f"_save_{event}", None)
+        if handler is not None:
+            with self.transaction():
+                handler(subject)
+    
+    def _save_patient_registered(self, patient: Patient) -> None:
+        self._connection.execute(
+            "INSERT INTO patients VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (patient.get_id(), patient.get_name(), patient.get_last_name(), patient.get_email(),
+             patient.get_phone(), patient.get_birth_date().isoformat(), patient.get_normalized_name(),
+             patient.get_registration_date().isoformat() if patient.get_registration_date() else None))
+        if self._name_search:
+            self._connection.execute(
+                "INSERT INTO patient_names VALUES (?, ?)",
+                (patient.get_id(), patient.get_normalized_name()))
+    
+    def _save_patient_updated(self, patient: Patient) -> None:
+        self._connection.execute(
+            "UPDATE patients SET name = ?, last_name = ?, email = ?, phone = ?, birth_date = ?, "
+            "normalized_name = ? WHERE id = ?",
+            (patient.get_name(), patient.get_last_name(), patient.get_email(), patient.get_phone(),
+             patient.get_birth_date().isoformat(), patient.get_normalized_name(), patient.get_id()))
+        if self._name_search:
+            self._connection.execute("DELETE FROM patient_names WHERE id = ?", (patient.get_id(),))
+            self._connection.execute(
+                "INSERT INTO patient_names VALUES (?, ?)",
+                (patient.get_id(), patient.get_normalized_name()))
+    
+    def _save_doctor_hired(self, doctor: Doctor) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO doctors VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (doctor.get_id(), doctor.get_name(), doctor.get_last_name(), doctor.get_email(),
+             doctor.get_phone(), doctor.get_specialty(), doctor.get_consultation_fee()))
+    
+    _save_doctor_updated = _save_doctor_hired
+    
+    def _save_working_hours_updated(self, doctor: Doctor) -> None:
+        self._connection.execute("DELETE FROM doctor_hours WHERE doctor_id = ?", (doctor.get_id(),))
+        self._connection.executemany(
+            "INSERT INTO doctor_hours VALUES (?, ?, ?, ?)",
+            [(doctor.get_id(), weekday, start.isoformat(), end.isoformat())
+             for weekday in range(7) for start, end in doctor.get_working_hours(weekday)])
+    
+    def _save_room_added(self, room: ConsultingRoom) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO rooms VALUES (?, ?)",
+            (room.get_number(), room.get_specialty()))
+    
+    def _save_appointment_scheduled(self, appointment: Appointment) -> None:
+        self._connection.execute(
+            "INSERT INTO appointments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (appointment.get_id(), appointment.get_doctor().get_id(), appointment.get_patient().get_id(),
+             appointment.get_date().isoformat(), appointment.get_time().isoformat(),
+             appointment.get_duration(), appointment.get_consultation_type(), appointment.get_status(),
+             appointment.get_room().get_number() if appointment.get_room() is not None else None))
+    
+    _save_appointment_imported = _save_appointment_scheduled
+    
+    def _update_appointment_status(self, appointment: Appointment) -> None:
+        self._connection.execute(
+            "UPDATE appointments SET status = ? WHERE id = ? AND doctor_id = ? AND date = ? AND time = ?",
+            (appointment.get_status(), appointment.get_id(), appointment.get_doctor().get_id(),
+             appointment.get_date().isoformat(), appointment.get_time().isoformat()))
+    
+    _save_appointment_confirmed = _update_appointment_status
+    _save_appointment_cancelled = _update_appointment_status
+    
+    def _save_appointment_rescheduled(self, appointment: Appointment) -> None:
+        self._connection.execute(
+            "DELETE FROM appointments WHERE id = ? AND doctor_id = ? AND date = ? AND time = ?",
+            (appointment.get_id(), appointment.get_doctor().get_id(), appointment.get_date().isoformat(),
+             appointment.get_time().isoformat()))
+    
+    def _save_consultation_added(self, consultation: Consultation) -> None:
+        self._connection.execute(
+            "INSERT INTO consultations (id, patient_id, doctor_id, date, time, diagnosis, treatment, fee) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (consultation.get_id(), consultation.get_patient().get_id(), consultation.get_doctor().get_id(),
+             consultation.get_date().isoformat(), consultation.get_time().isoformat(),
+             consultation.get_diagnosis(), consultation.get_treatment(), consultation.calculate_fee()))
+    
+    def _save_consultation_updated(self, consultation: Consultation) -> None:
+        self._connection.execute(
+            "UPDATE consultations SET diagnosis = ?, treatment = ? WHERE patient_id = ? AND id = ?",
+            (consultation.get_diagnosis(), consultation.get_treatment(),
+             consultation.get_patient().get_id(), consultation.get_id()))
+    
+    def load_into(self, clinic: Clinic) -> None:
+        with self._lock:
+            rooms = {}
+            for number, specialty in self._connection.execute("SELECT number, specialty FROM rooms ORDER BY number"):
+                room = rooms[number] = ConsultingRoom(number, specialty)
+                clinic._consulting_rooms.append(room)
+                clinic._room_scheduler.add_room(room)
+                clinic._notify_loaded("room_added", room)
+            
+            for row in self._connection.execute("SELECT * FROM doctors ORDER BY id").fetchall():
+                doctor = Doctor(*row)
+                clinic._add_doctor(doctor)
+                clinic._notify_loaded("doctor_hired", doctor)
+            
+            hours = {}
+            for doctor_id, weekday, start, end in self._connection.execute(
+                    "SELECT doctor_id, weekday, start, end FROM doctor_hours ORDER BY doctor_id, weekday, start"):
+                hours.setdefault((doctor_id, weekday), []).append((time.fromisoformat(start), time.fromisoformat(end)))
+            
+            fee_rows = self._connection.execute(
+                "SELECT doctor_id, date, SUM(fee), COUNT(*) FROM consultations GROUP BY doctor_id, date").fetchall()
+            patient_count = self._connection.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+            
+            self._loaded_from = self._load_appointments_from or date.today()
+            start = self._loaded_from.isoformat()
+            past_counts = self._connection.execute(
+                "SELECT date, doctor_id, status, COUNT(*), SUM(CASE WHEN room IS NULL THEN 0 ELSE duration END) "
+                "FROM appointments WHERE date < ? GROUP BY date, doctor_id, status", (start,)).fetchall()
+            rows = self._connection.execute(
+                "SELECT id, doctor_id, patient_id, date, time, duration, consultation_type, status, room "
+                "FROM appointments WHERE date >= ? ORDER BY doctor_id, date, time", (start,)).fetchall()
+        
+        for (doctor_id, weekday), blocks in hours.items():
+            doctor = clinic.find_doctor_by_id(doctor_id)
+            if doctor is not None:
+                doctor._apply_working_hours(weekday, blocks)
+        
+        for doctor_id, day, fees, count in fee_rows:
+            doctor = clinic.find_doctor_by_id(doctor_id)
+            if doctor is not None:
+                doctor._ledger.add(date.fromisoformat(day), fees, count)
+        clinic._metrics.add_loaded_totals(patient_count, sum(row[3] for row in fee_rows),
+                                          sum(row[2] for row in fee_rows))
+        clinic._metrics.add_loaded_appointments((date.fromisoformat(day), doctor_id, status, count, room_minutes)
+                                                for day, doctor_id, status, count, room_minutes in past_counts)
+        
+        for appointment_id, doctor_id, patient_id, day, start_time, duration, consultation_type, status, room in rows:
+            doctor = clinic.find_doctor_by_id(doctor_id)
+            patient = clinic.find_patient_by_id(patient_id)
+            if doctor is None or patient is None:
+                continue
+            appointment = Appointment(appointment_id, date.fromisoformat(day), time.fromisoformat(start_time),
+                                      doctor, patient, consultation_type, duration)
+            appointment._status = status
+            if status in INACTIVE_STATUSES:
+                clinic._notify_loaded("appointment_loaded", appointment)
+                continue
+            if not doctor._schedule._insert(appointment):
+                continue
+            if room in rooms and clinic._room_scheduler.reserve_room(rooms[room], appointment.get_date(),
+                                                                     appointment.get_time(), duration):
+                appointment._room = rooms[room]
+            clinic._notify_loaded("appointment_loaded", appointment)
+    
+    def has_patient(self, patient_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM patients WHERE id = ?", (patient_id,)).fetchone()
+        return row is not None
+    
+    def has_appointment(self, appointment_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM appointments WHERE id = ?", (appointment_id,)).fetchone()
+        return row is not None
+    
+    def has_slot(self, doctor_id: str, day: date, start_minute: int, end_minute: int) -> bool:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT time, duration, status FROM appointments WHERE doctor_id = ? AND date = ?",
+                (doctor_id, day.isoformat())).fetchall()
+        for start_time, duration, status in rows:
+            if status in INACTIVE_STATUSES:
+                continue
+            start = minute_of_day(time.fromisoformat(start_time))
+            if start < end_minute and start_minute < start + duration:
+                return True
+        return False
+    
+    def get_loaded_from(self) -> Optional[date]:
+        return self._loaded_from
+    
+    def count_patients(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+    
+    def load_patient(self, patient_id: str, clinic: Clinic) -> Optional[Patient]:
+        patients = self.load_patients([patient_id], clinic)
+        return patients[0] if patients else None
+    
+    def load_patients(self, patient_ids: List[str], clinic: Clinic) -> List[Patient]:
+        placeholders = ", ".join("?" * len(patient_ids))
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, name, last_name, email, phone, birth_date, registered_on FROM patients "
+                f"WHERE id IN ({placeholders})", patient_ids).fetchall()
+            history = self._connection.execute(
+                "SELECT patient_id, id, doctor_id, date, time, diagnosis, treatment, fee FROM consultations "
+                f"WHERE patient_id IN ({placeholders}) ORDER BY seq", patient_ids).fetchall()
+        
+        patients = {}
+        for row in rows:
+            patient = patients[row[0]] = Patient(*row[:5], date.fromisoformat(row[5]))
+            if row[6]:
+                patient._registered_on = date.fromisoformat(row[6])
+            patient._clinic = clinic
+        for patient_id, consultation_id, doctor_id, day, start_time, diagnosis, treatment, fee in history:
+            patient = patients.get(patient_id)
+            doctor = clinic.find_doctor_by_id(doctor_id)
+            if patient is None or doctor is None:
+                continue
+            consultation = Consultation(consultation_id, date.fromisoformat(day), time.fromisoformat(start_time),
+                                        doctor, patient)
+            consultation._diagnosis = diagnosis
+            consultation._treatment = treatment
+            consultation._applied_fee = fee
+            patient._get_history()._append(consultation)
+        return [patients[patient_id] for patient_id in patient_ids if patient_id in patients]
+    
+    def iter_patient_ids(self, batch_size: int = 1000, order_by: str = "id",
+                         after: Optional[str] = None) -> Iterator[str]:
+        if order_by == "name":
+            key = "normalized_name, id"
+            last = tuple(after.split("\t", 1)) if after is not None else None
+        else:
+            key = "id"
+            last = (after,) if after is not None else None
+        
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._connection.execute(
+                        f"SELECT {key} FROM patients ORDER BY {key} LIMIT ?", (batch_size,)).fetchall()
+                else:
+                    rows = self._connection.execute(
+                        f"SELECT {key} FROM patients WHERE ({key}) > ({', '.join('?' * len(last))}) "
+                        f"ORDER BY {key} LIMIT ?", last + (batch_size,)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[-1]
+            last = rows[-1]
+    
+    def iter_patients(self, clinic: Clinic, batch_size: int = 1000) -> Iterator[Patient]:
+        batch = []
+        for patient_id in self.iter_patient_ids(batch_size):
+            batch.append(patient_id)
+            if len(batch) == batch_size:
+                yield from self.load_patients(batch, clinic)
+                batch = []
+        if batch:
+            yield from self.load_patients(batch, clinic)
+    
+    def search_patient_ids(self, name: str, limit: Optional[int] = None) -> List[str]:
+        query = normalize_name(name)
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        order = ("ORDER BY CASE WHEN normalized_name = ? THEN 0 "
+                 "WHEN normalized_name LIKE ? ESCAPE '\\' THEN 1 "
+                 "WHEN ' ' || normalized_name LIKE ? ESCAPE '\\' THEN 2 ELSE 3 END, normalized_name, id "
+                 "LIMIT ?")
+        ranking = (query, pattern[1:], "% " + pattern[1:], -1 if limit is None else limit)
+        
+        if self._name_search and len(query) >= 3:
+            sql = ("SELECT id FROM patient_names WHERE normalized_name MATCH ? "
+                   "AND normalized_name LIKE ? ESCAPE '\\' " + order)
+            params = ('"' + query.replace('"', '""') + '"', pattern) + ranking
+        else:
+            sql = "SELECT id FROM patients WHERE normalized_name LIKE ? ESCAPE '\\' " + order
+            params = (pattern,) + ranking
+        
+        with self._lock:
+            return [patient_id for (patient_id,) in self._connection.execute(sql, params)]
+
+if __name__ == "__main__":
+    from Clinic_System import main_menu
+    
+    database_path = sys.argv[1] if len(sys.argv) > 1 else "clinisoft.db"
+    print(f"CliniSoft - persistent mode ({database_path})")
+    main_menu(Clinic("Marbella Clinic", "Lima, Peru", SQLiteStorage(database_path)))
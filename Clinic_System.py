@@ -1,14 +1,132 @@
-from datetime import datetime, date, time
-import json
-from typing import List, Dict, Optional
+from datetime import datetime, date, time, timedelta
+from array import array
+from bisect import bisect_left, bisect_right, insort
+import heapq
+import itertools
+import logging
+import os
+import sys
+import threading
+import time as clock
+import unicodedata
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
+from weakref import WeakValueDictionary
+
+DEFAULT_APPOINTMENT_MINUTES = 30
+ROOM_SLOT_MINUTES = 15
+APPOINTMENT_STATUSES = ("Scheduled", "Confirmed", "Cancelled", "Rescheduled")
+INACTIVE_STATUSES = ("Cancelled", "Rescheduled")
+
+logger = logging.getLogger("clinisoft")
+logger.addHandler(logging.NullHandler())
+_console_handler = None
+
+def enable_console_output(level: int = logging.INFO) -> None:
+    global _console_handler
+    if _console_handler is None:
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_console_handler)
+    logger.setLevel(level)
+
+def disable_console_output() -> None:
+    global _console_handler
+    if _console_handler is not None:
+        logger.removeHandler(_console_handler)
+        _console_handler = None
+    logger.setLevel(logging.NOTSET)
+
+def minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+class AppointmentIdGenerator:
+    def __init__(self, prefix: str = "C"):
+        self._prefix = f"{prefix}{datetime.now().strftime('%Y%m%d%H%M%S')}{os.getpid() % 100000:05d}"
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def next_id(self) -> str:
+        with self._lock:
+            sequence = next(self._counter)
+        return f"{self._prefix}-{sequence}"
+
+appointment_ids = AppointmentIdGenerator()
+waitlist_ids = AppointmentIdGenerator("W")
+series_ids = AppointmentIdGenerator("S")
+
+def minute_mask(start: int, end: int) -> int:
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+def free_run_starts(free: int, length: int) -> int:
+    runs = free
+    covered = 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        runs &= runs >> shift
+        covered += shift
+    return runs
+
+def room_slot_mask(start_time: time, duration_minutes: int) -> int:
+    start = minute_of_day(start_time)
+    first_slot = start // ROOM_SLOT_MINUTES
+    last_slot = -(-(start + duration_minutes) // ROOM_SLOT_MINUTES)
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+_aligned_masks: Dict[int, int] = {}
+
+def _aligned_starts(step_minutes: int) -> int:
+    mask = _aligned_masks.get(step_minutes)
+    if mask is None:
+        mask = 0
+        for minute in range(0, 24 * 60, step_minutes):
+            mask |= 1 << minute
+        _aligned_masks[step_minutes] = mask
+    return mask
+
+def normalize_name(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+_today = date.min
+_next_midnight = 0.0
+
+def current_day() -> date:
+    global _today, _next_midnight
+    if clock.time() >= _next_midnight:
+        _today = date.today()
+        _next_midnight = datetime.combine(_today + timedelta(days=1), time()).timestamp()
+    return _today
+
+def age_on(birth_date: date, day: date) -> int:
+    return day.year - birth_date.year - ((day.month, day.day) < (birth_date.month, birth_date.day))
+
+def compute_ages(patients: Iterator['Patient'], day: Optional[date] = None) -> Dict[str, int]:
+    day = day or current_day()
+    year = day.year
+    day_key = day.month * 100 + day.day
+    ages = {}
+    for patient in patients:
+        birth_date = patient._birth_date
+        ages[patient._id] = year - birth_date.year - (day_key < birth_date.month * 100 + birth_date.day)
+    return ages
 
 class Person:
+    __slots__ = ("_id", "_name", "_last_name", "_email", "_phone", "_clinic", "_full_name", "_normalized_name",
+                 "__weakref__")
+    
+    UPDATED_EVENT = "person_updated"
+    
     def __init__(self, id: str, name: str, last_name: str, email: str, phone: str):
         self._id = id
         self._name = name
         self._last_name = last_name
         self._email = email
         self._phone = phone
+        self._clinic = None
+        self._full_name = None
+        self._normalized_name = None
     
     def get_complete_info(self) -> str:
         raise NotImplementedError("Abstract method")
@@ -16,70 +134,388 @@ class Person:
     def get_id(self) -> str:
         return self._id
     
+    def get_name(self) -> str:
+        return self._name
+    
+    def get_last_name(self) -> str:
+        return self._last_name
+    
     def get_full_name(self) -> str:
-        return f"{self._name} {self._last_name}"
+        if self._full_name is None:
+            self._full_name = f"{self._name} {self._last_name}"
+        return self._full_name
+    
+    def get_normalized_name(self) -> str:
+        if self._normalized_name is None:
+            self._normalized_name = normalize_name(f"{self._name} {self._last_name}")
+        return self._normalized_name
     
     def get_email(self) -> str:
         return self._email
     
+    def get_phone(self) -> str:
+        return self._phone
+    
+    def set_name(self, name: str, last_name: str) -> None:
+        self._update(name, last_name, self._email, self._phone)
+        self._notify(self.UPDATED_EVENT, self)
+    
+    def set_email(self, email: str) -> None:
+        self._update(self._name, self._last_name, email, self._phone)
+        self._notify(self.UPDATED_EVENT, self)
+    
+    def set_phone(self, phone: str) -> None:
+        self._update(self._name, self._last_name, self._email, phone)
+        self._notify(self.UPDATED_EVENT, self)
+    
+    def _update(self, name: str, last_name: str, email: str, phone: str) -> None:
+        if name != self._name or last_name != self._last_name:
+            previous = self.get_normalized_name()
+            self._name = name
+            self._last_name = last_name
+            self._full_name = None
+            self._normalized_name = None
+            self._renamed(previous)
+        self._email = email
+        self._phone = phone
+    
+    def _renamed(self, previous_name: str) -> None:
+        pass
+    
+    def _notify(self, event: str, subject: object) -> None:
+        if self._clinic is not None:
+            self._clinic._notify(event, subject)
+    
     def __str__(self) -> str:
         return self.get_complete_info()
 
 class Patient(Person):
+    __slots__ = ("_birth_date", "_medical_history", "_age", "_age_day", "_registered_on", "_info")
+    
+    UPDATED_EVENT = "patient_updated"
+    
     def __init__(self, id: str, name: str, last_name: str, email: str, phone: str, birth_date: date):
         super().__init__(id, name, last_name, email, phone)
         self._birth_date = birth_date
-        self._medical_history = ConsultationList()
+        self._medical_history = None
+        self._age = 0
+        self._age_day = None
+        self._registered_on = None
+        self._info = None
     
     def get_complete_info(self) -> str:
         age = self._calculate_age()
-        return f"Patient: {self.get_full_name()} | ID: {self._id} | Age: {age} years"
+        if self._info is None:
+            self._info = f"Patient: {self.get_full_name()} | ID: {self._id} | Age: {age} years"
+        return self._info
+    
+    def get_birth_date(self) -> date:
+        return self._birth_date
+    
+    def get_registration_date(self) -> Optional[date]:
+        return self._registered_on
+    
+    def set_birth_date(self, birth_date: date) -> None:
+        self._birth_date = birth_date
+        self._age_day = None
+        self._notify(self.UPDATED_EVENT, self)
+    
+    def get_age(self) -> int:
+        return self._calculate_age()
+    
+    def get_upcoming_appointments(self, limit: Optional[int] = None) -> List['Appointment']:
+        if self._clinic is None:
+            return []
+        return self._clinic.get_upcoming_appointments(self._id, None, limit)
+    
+    def get_past_appointments(self, limit: Optional[int] = None) -> List['Appointment']:
+        if self._clinic is None:
+            return []
+        return self._clinic.get_past_appointments(self._id, None, limit)
+    
+    def _renamed(self, previous_name: str) -> None:
+        self._info = None
+        if self._clinic is not None:
+            self._clinic._patients._rename(self, previous_name)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'id': self._id,
+            'name': self._name,
+            'last_name': self._last_name,
+            'email': self._email,
+            'phone': self._phone,
+            'birth_date': self._birth_date.isoformat(),
+            'age': self._calculate_age(),
+            'registered_on': self._registered_on.isoformat() if self._registered_on else None
+        }
     
     def _calculate_age(self) -> int:
-        today = date.today()
-        return today.year - self._birth_date.year - (
-            (today.month, today.day) < (self._birth_date.month, self._birth_date.day))
+        today = current_day()
+        if self._age_day is not today:
+            self._age = age_on(self._birth_date, today)
+            self._age_day = today
+            self._info = None
+        return self._age
+    
+    def _get_history(self) -> 'ConsultationList':
+        if self._medical_history is None:
+            self._medical_history = ConsultationList()
+        return self._medical_history
     
     def add_consultation(self, consultation: 'Consultation') -> None:
-        self._medical_history.add_consultation(consultation)
+        self._get_history().add_consultation(consultation)
+        consultation.get_doctor()._record_fee(consultation)
+        self._notify("consultation_added", consultation)
     
     def get_complete_history(self) -> List['Consultation']:
+        if self._medical_history is None:
+            return []
         return self._medical_history.get_all_consultations()
     
+    def get_history_between(self, start_date: date, end_date: date) -> List['Consultation']:
+        if self._medical_history is None:
+            return []
+        return self._medical_history.get_consultations_between(start_date, end_date)
+    
     def show_history(self) -> None:
         print(f"\n--- Medical History of {self.get_full_name()} ---")
-        self._medical_history.show_history_recursive()
+        self._get_history().show_history()
 
 class Doctor(Person):
+    __slots__ = ("_specialty", "_consultation_fee", "_schedule", "_ledger", "_lock",
+                 "_working_hours", "_working_masks")
+    
+    UPDATED_EVENT = "doctor_updated"
+    
     def __init__(self, id: str, name: str, last_name: str, email: str, phone: str, specialty: str, consultation_fee: float):
         super().__init__(id, name, last_name, email, phone)
-        self._specialty = specialty
+        self._specialty = sys.intern(specialty)
         self._consultation_fee = consultation_fee
         self._schedule = AppointmentList()
+        self._ledger = FeeLedger()
+        self._lock = threading.Lock()
+        self._working_hours: Dict[int, List[Tuple[time, time]]] = {}
+        self._working_masks: Dict[int, int] = {}
     
     def get_complete_info(self) -> str:
         return f"Dr. {self.get_full_name()} | {self._specialty} | Fee: S/.{self._consultation_fee}"
     
+    def set_working_hours(self, weekday: int, blocks: List[Tuple[time, time]]) -> None:
+        self._apply_working_hours(weekday, blocks)
+        self._notify("working_hours_updated", self)
+    
+    def _apply_working_hours(self, weekday: int, blocks: List[Tuple[time, time]]) -> None:
+        mask = 0
+        for start, end in blocks:
+            if end <= start:
+                raise ValueError(f"Working block {start}-{end} must end after it starts")
+            mask |= minute_mask(minute_of_day(start), minute_of_day(end))
+        
+        if blocks:
+            self._working_hours[weekday] = sorted(blocks)
+            self._working_masks[weekday] = mask
+        else:
+            self._working_hours.pop(weekday, None)
+            self._working_masks.pop(weekday, None)
+    
+    def get_working_hours(self, weekday: int) -> List[Tuple[time, time]]:
+        return list(self._working_hours.get(weekday, ()))
+    
+    def iter_free_slots(self, start: datetime, end: datetime,
+                        duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+                        step_minutes: int = ROOM_SLOT_MINUTES) -> Iterator[datetime]:
+        aligned = _aligned_starts(step_minutes)
+        day = start.date()
+        while day <= end.date():
+            template = self._working_masks.get(day.weekday())
+            if template:
+                free = template & ~self._schedule.get_busy_mask(day)
+                starts = free_run_starts(free, duration_minutes) & aligned
+                if day == start.date():
+                    starts &= ~((1 << (start.hour * 60 + start.minute)) - 1)
+                if day == end.date():
+                    last_start = end.hour * 60 + end.minute - duration_minutes
+                    starts &= (1 << (last_start + 1)) - 1 if last_start >= 0 else 0
+                
+                midnight = datetime.combine(day, time())
+                while starts:
+                    lowest = starts & -starts
+                    yield midnight + timedelta(minutes=lowest.bit_length() - 1)
+                    starts ^= lowest
+            day += timedelta(days=1)
+    
+    def get_specialty(self) -> str:
+        return self._specialty
+    
+    def get_consultation_fee(self) -> float:
+        return self._consultation_fee
+    
+    def to_dict(self) -> Dict:
+        return {
+            'id': self._id,
+            'name': self._name,
+            'last_name': self._last_name,
+            'email': self._email,
+            'phone': self._phone,
+            'specialty': self._specialty,
+            'consultation_fee': self._consultation_fee
+        }
+    
     def schedule_appointment(self, appointment: 'Appointment') -> bool:
-        return self._schedule.add_appointment(appointment)
+        if not self._book(appointment):
+            return False
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Appointment scheduled successfully. Total appointments: %d", self._schedule.size)
+        return True
+    
+    def _book(self, appointment: 'Appointment') -> bool:
+        if self._clinic is not None and self._clinic._is_stored_slot_taken(appointment):
+            return False
+        with self._lock:
+            if not self._schedule._insert(appointment):
+                return False
+            if self._clinic is not None and not self._clinic._assign_room(appointment):
+                self._schedule._remove(appointment)
+                return False
+        self._notify("appointment_scheduled", appointment)
+        return True
+    
+    def _release(self, appointment: 'Appointment') -> bool:
+        with self._lock:
+            return self._release_locked(appointment)
+    
+    def _release_locked(self, appointment: 'Appointment') -> bool:
+        if not self._schedule._remove(appointment):
+            return False
+        room = appointment.get_room()
+        if room is not None:
+            room.release(appointment.get_date(), appointment.get_time(), appointment.get_duration())
+        return True
+    
+    def _restore_locked(self, appointment: 'Appointment') -> None:
+        self._schedule._insert(appointment)
+        room = appointment.get_room()
+        if room is not None and not room.reserve(self, appointment.get_date(), appointment.get_time(),
+                                                 appointment.get_duration()):
+            appointment._room = None
+            if self._clinic is not None:
+                self._clinic._assign_room(appointment)
+    
+    def _cancel(self, appointment: 'Appointment') -> None:
+        self._cancel_many([appointment])
+    
+    def _cancel_many(self, appointments: List['Appointment']) -> int:
+        with self._lock:
+            cancelled = [appointment for appointment in appointments
+                         if appointment._status not in INACTIVE_STATUSES and self._release_locked(appointment)]
+            for appointment in cancelled:
+                appointment._status = "Cancelled"
+        for appointment in cancelled:
+            self._notify("appointment_cancelled", appointment)
+        if self._clinic is not None:
+            for appointment in cancelled:
+                self._clinic._offer_slot(appointment)
+        return len(cancelled)
+    
+    def _insert_many_locked(self, appointments: List['Appointment']) -> List[int]:
+        conflicts = []
+        for index, appointment in enumerate(appointments):
+            if not self._schedule._insert(appointment):
+                conflicts.append(index)
+            elif self._clinic is not None and not self._clinic._assign_room(appointment):
+                self._schedule._remove(appointment)
+                conflicts.append(index)
+        return conflicts
+    
+    def _book_many(self, appointments: List['Appointment'],
+                   atomic: bool = True) -> Tuple[List['Appointment'], List['Appointment']]:
+        with self._lock:
+            conflicts = self._insert_many_locked(appointments)
+            failed = set(conflicts)
+            booked = [appointment for index, appointment in enumerate(appointments) if index not in failed]
+            if atomic and conflicts:
+                for appointment in booked:
+                    self._release_locked(appointment)
+                    appointment._room = None
+                booked = []
+        for appointment in booked:
+            self._notify("appointment_scheduled", appointment)
+        return booked, [appointments[index] for index in conflicts]
+    
+    def _reschedule_many(self, current: List['Appointment'],
+                         replacements: List['Appointment'],
+                         atomic: bool = True) -> Tuple[List['Appointment'], List['Appointment']]:
+        with self._lock:
+            pairs = [(appointment, replacement) for appointment, replacement in zip(current, replacements)
+                     if appointment._status not in INACTIVE_STATUSES]
+            for appointment, _ in pairs:
+                self._release_locked(appointment)
+            conflicts = set(self._insert_many_locked([replacement for _, replacement in pairs]))
+            restored = conflicts
+            if atomic and conflicts:
+                for index, (_, replacement) in enumerate(pairs):
+                    if index not in conflicts:
+                        self._release_locked(replacement)
+                        replacement._room = None
+                restored = set(range(len(pairs)))
+            
+            moved, booked = [], []
+            for index, (appointment, replacement) in enumerate(pairs):
+                if index in restored:
+                    self._restore_locked(appointment)
+                else:
+                    appointment._status = "Rescheduled"
+                    moved.append(appointment)
+                    booked.append(replacement)
+            failed = [replacement for index, (_, replacement) in enumerate(pairs) if index in conflicts]
+        
+        for appointment in moved:
+            self._notify("appointment_rescheduled", appointment)
+        for appointment in booked:
+            self._notify("appointment_scheduled", appointment)
+        if self._clinic is not None:
+            for appointment in moved:
+                self._clinic._offer_slot(appointment)
+        return booked, failed
+    
+    def schedule_series(self, patient: Patient, start_date: date, start_time: time, rule: 'RecurrenceRule',
+                        consultation_type: str, duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+                        atomic: bool = True) -> 'AppointmentSeries':
+        series = AppointmentSeries(series_ids.next_id(), self, patient, start_time, consultation_type,
+                                   duration_minutes, rule)
+        booked, conflicts = self._book_many(series._new_occurrences(rule.occurrences(start_date)), atomic)
+        series._appointments = booked
+        series._conflicts = conflicts
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Series %s scheduled: %d appointments, %d conflicts", series.get_id(), len(booked),
+                        len(conflicts))
+        return series
+    
+    def _archive_before(self, day: date) -> List['Appointment']:
+        with self._lock:
+            return self._schedule._archive_before(day)
+    
+    def _record_fee(self, consultation: 'Consultation') -> None:
+        with self._lock:
+            self._ledger.add(consultation.get_date(), consultation.calculate_fee())
     
     def get_daily_appointments(self, date: date) -> List['Appointment']:
         return self._schedule.get_appointments_by_date(date)
     
     def calculate_payment(self, start_date: date, end_date: date) -> float:
-        simulated_consultations = [
-            SimulatedConsultation(150.0),
-            SimulatedConsultation(150.0),
-            SimulatedConsultation(150.0)
-        ]
-        return self._calculate_total_recursive(simulated_consultations, 0)
-    
-    def _calculate_total_recursive(self, consultations: List['SimulatedConsultation'], index: int) -> float:
-        if index >= len(consultations):
-            return 0.0
-        return consultations[index].fee + self._calculate_total_recursive(consultations, index + 1)
+        with self._lock:
+            return self._ledger.total_between(start_date, end_date)
+    
+    def count_consultations(self, start_date: date, end_date: date) -> int:
+        with self._lock:
+            return self._ledger.count_between(start_date, end_date)
 
 class Secretary(Person):
+    __slots__ = ("_shift", "_assigned_area")
+    
+    UPDATED_EVENT = "secretary_updated"
+    
     def __init__(self, id: str, name: str, last_name: str, email: str, phone: str, shift: str, assigned_area: str):
         super().__init__(id, name, last_name, email, phone)
         self._shift = shift
@@ -91,17 +527,26 @@ class Secretary(Person):
     def register_patient(self, clinic: 'Clinic', patient: Patient) -> bool:
         return clinic.register_patient(patient)
     
-    def schedule_medical_appointment(self, doctor: Doctor, patient: Patient, date: date, time: time, consultation_type: str) -> Optional['Appointment']:
-        if doctor._schedule.check_availability(doctor, date, time):
+    def schedule_medical_appointment(self, doctor: Doctor, patient: Patient, date: date, time: time, consultation_type: str,
+                                     duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> Optional['Appointment']:
+        if doctor._schedule.check_availability(doctor, date, time, duration_minutes):
             appointment = Appointment(
-                f"C{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                date, time, doctor, patient, consultation_type
+                appointment_ids.next_id(),
+                date, time, doctor, patient, consultation_type, duration_minutes
             )
             if doctor.schedule_appointment(appointment):
                 return appointment
         return None
+    
+    def schedule_recurring_appointments(self, doctor: Doctor, patient: Patient, start_date: date, time: time,
+                                        rule: 'RecurrenceRule', consultation_type: str,
+                                        duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+                                        atomic: bool = True) -> 'AppointmentSeries':
+        return doctor.schedule_series(patient, start_date, time, rule, consultation_type, duration_minutes, atomic)
 
 class ConsultationNode:
+    __slots__ = ("consultation", "next")
+    
     def __init__(self, consultation: 'Consultation'):
         self.consultation = consultation
         self.next = None
@@ -109,122 +554,277 @@ class ConsultationNode:
 class ConsultationList:
     def __init__(self):
         self.head = None
+        self.tail = None
         self.size = 0
+        self._by_date: Dict[date, List['Consultation']] = {}
+        self._dates: List[date] = []
     
     def add_consultation(self, consultation: 'Consultation') -> None:
+        self._append(consultation)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Consultation added to history. Total: %d consultations", self.size)
+    
+    def _append(self, consultation: 'Consultation') -> None:
         new_node = ConsultationNode(consultation)
         
         if self.head is None:
             self.head = new_node
         else:
-            current = self.head
-            while current.next is not None:
-                current = current.next
-            current.next = new_node
+            self.tail.next = new_node
+        self.tail = new_node
         self.size += 1
-        print(f"✓ Consultation added to history. Total: {self.size} consultations")
+        self._index(consultation)
+    
+    def _index(self, consultation: 'Consultation') -> None:
+        consultation_date = consultation.get_date()
+        same_day = self._by_date.get(consultation_date)
+        if same_day is not None:
+            same_day.append(consultation)
+            return
+        
+        self._by_date[consultation_date] = [consultation]
+        if not self._dates or self._dates[-1] < consultation_date:
+            self._dates.append(consultation_date)
+        else:
+            insort(self._dates, consultation_date)
     
     def find_consultation_by_date(self, date: date) -> Optional['Consultation']:
-        current = self.head
-        while current is not None:
-            if current.consultation.get_date() == date:
-                return current.consultation
-            current = current.next
-        return None
+        same_day = self._by_date.get(date)
+        return same_day[0] if same_day else None
+    
+    def iter_consultations_between(self, start_date: date, end_date: date) -> Iterator['Consultation']:
+        index = bisect_left(self._dates, start_date)
+        while index < len(self._dates) and self._dates[index] <= end_date:
+            yield from self._by_date[self._dates[index]]
+            index += 1
+    
+    def get_consultations_between(self, start_date: date, end_date: date) -> List['Consultation']:
+        return list(self.iter_consultations_between(start_date, end_date))
     
     def get_all_consultations(self) -> List['Consultation']:
-        consultations = []
+        return list(self)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator['Consultation']:
         current = self.head
         while current is not None:
-            consultations.append(current.consultation)
+            yield current.consultation
             current = current.next
-        return consultations
     
-    def show_history_recursive(self, current_node=None) -> None:
-        if current_node is None:
-            current_node = self.head
-            if current_node is None:
-                print("No consultations registered")
-                return
-        
-        if current_node is None:
+    def show_history(self) -> None:
+        if self.head is None:
+            print("No consultations registered")
             return
         
-        consultation = current_node.consultation
-        print(f"Date: {consultation.get_date()} | Doctor: {consultation.get_doctor().get_full_name()}")
-        print(f"Diagnosis: {consultation.get_diagnosis()}")
-        print("-" * 50)
-        
-        self.show_history_recursive(current_node.next)
+        for consultation in self:
+            print(f"Date: {consultation.get_date()} | Doctor: {consultation.get_doctor().get_full_name()}")
+            print(f"Diagnosis: {consultation.get_diagnosis()}")
+            print("-" * 50)
+    
+    show_history_recursive = show_history
 
-class AppointmentNode:
-    def __init__(self, appointment: 'Appointment'):
-        self.appointment = appointment
-        self.next = None
+class DaySchedule:
+    __slots__ = ("day", "_starts", "_ends", "_appointments", "_busy")
+    
+    def __init__(self, day: date):
+        self.day = day
+        self._starts = array("H")
+        self._ends = array("H")
+        self._appointments: List['Appointment'] = []
+        self._busy = 0
+    
+    def is_free(self, start: int, end: int) -> bool:
+        index = bisect_left(self._starts, end)
+        return index == 0 or self._ends[index - 1] <= start
+    
+    def insert(self, appointment: 'Appointment') -> bool:
+        start = appointment.get_start_minute()
+        end = appointment.get_end_minute()
+        if not self.is_free(start, end):
+            return False
+        
+        index = bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+        self._appointments.insert(index, appointment)
+        self._busy |= minute_mask(start, end)
+        return True
+    
+    def remove(self, appointment: 'Appointment') -> bool:
+        index = bisect_left(self._starts, appointment.get_start_minute())
+        if index == len(self._appointments) or self._appointments[index] is not appointment:
+            return False
+        
+        self._busy &= ~minute_mask(self._starts[index], self._ends[index])
+        del self._starts[index]
+        del self._ends[index]
+        del self._appointments[index]
+        return True
+    
+    def get_busy_mask(self) -> int:
+        return self._busy
+    
+    def get_appointments(self) -> List['Appointment']:
+        return list(self._appointments)
+    
+    def __len__(self) -> int:
+        return len(self._appointments)
+    
+    def __iter__(self) -> Iterator['Appointment']:
+        return iter(self._appointments)
 
 class AppointmentList:
     def __init__(self):
-        self.head = None
+        self._days: Dict[date, DaySchedule] = {}
+        self._dates: List[date] = []
         self.size = 0
     
+    def _get_day(self, day: date) -> DaySchedule:
+        schedule = self._days.get(day)
+        if schedule is None:
+            schedule = DaySchedule(day)
+            self._days[day] = schedule
+            insort(self._dates, day)
+        return schedule
+    
     def add_appointment(self, appointment: 'Appointment') -> bool:
-        new_node = AppointmentNode(appointment)
+        if not self._insert(appointment):
+            return False
         
-        if self.head is None or appointment.get_date_time() < self.head.appointment.get_date_time():
-            new_node.next = self.head
-            self.head = new_node
-            self.size += 1
-            print(f"✓ Appointment scheduled successfully. Total appointments: {self.size}")
-            return True
-        
-        current = self.head
-        while current.next is not None and current.next.appointment.get_date_time() < appointment.get_date_time():
-            current = current.next
-        
-        new_node.next = current.next
-        current.next = new_node
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Appointment scheduled successfully. Total appointments: %d", self.size)
+        return True
+    
+    def _insert(self, appointment: 'Appointment') -> bool:
+        if not self._get_day(appointment.get_date()).insert(appointment):
+            return False
         self.size += 1
-        print(f"✓ Appointment scheduled successfully. Total appointments: {self.size}")
         return True
     
-    def check_availability(self, doctor: Doctor, date: date, time: time) -> bool:
-        date_time = datetime.combine(date, time)
-        current = self.head
-        
-        while current is not None:
-            if current.appointment.get_date_time() == date_time:
-                return False
-            current = current.next
-        
+    def _remove(self, appointment: 'Appointment') -> bool:
+        schedule = self._days.get(appointment.get_date())
+        if schedule is None or not schedule.remove(appointment):
+            return False
+        self.size -= 1
         return True
     
+    def _archive_before(self, day: date) -> List['Appointment']:
+        cut = bisect_left(self._dates, day)
+        archived = []
+        for old_day in self._dates[:cut]:
+            archived.extend(self._days.pop(old_day))
+        del self._dates[:cut]
+        self.size -= len(archived)
+        return archived
+    
+    def check_availability(self, doctor: Doctor, date: date, time: time,
+                           duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> bool:
+        start = minute_of_day(time)
+        with doctor._lock:
+            schedule = self._days.get(date)
+            return schedule is None or schedule.is_free(start, start + duration_minutes)
+    
     def find_appointment_by_patient(self, patient_id: str) -> List['Appointment']:
-        found_appointments = []
-        current = self.head
-        
-        while current is not None:
-            if current.appointment.get_patient().get_id() == patient_id:
-                found_appointments.append(current.appointment)
-            current = current.next
-        
-        return found_appointments
+        return [appointment for appointment in self
+                if appointment.get_patient().get_id() == patient_id]
     
     def get_appointments_by_date(self, date: date) -> List['Appointment']:
-        date_appointments = []
-        current = self.head
+        schedule = self._days.get(date)
+        if schedule is None:
+            return []
+        return schedule.get_appointments()
+    
+    def get_busy_mask(self, date: date) -> int:
+        schedule = self._days.get(date)
+        return schedule.get_busy_mask() if schedule is not None else 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator['Appointment']:
+        for day in self._dates:
+            yield from self._days[day]
+
+class FeeLedger:
+    def __init__(self):
+        self._days = array("l")
+        self._totals = array("d")
+        self._counts = array("l")
+        self._running_totals: List[float] = []
+        self._running_counts: List[int] = []
+        self._stale_from: Optional[int] = None
+        self._shared = False
+    
+    def share(self) -> Tuple[array, array, array]:
+        self._shared = True
+        return self._days, self._totals, self._counts
+    
+    def add(self, day: date, fee: float, count: int = 1) -> None:
+        if self._shared:
+            self._days = self._days[:]
+            self._totals = self._totals[:]
+            self._counts = self._counts[:]
+            self._shared = False
         
-        while current is not None:
-            if current.appointment.get_date() == date:
-                date_appointments.append(current.appointment)
-            current = current.next
+        day = day.toordinal()
+        index = bisect_left(self._days, day)
+        if index == len(self._days):
+            self._days.append(day)
+            self._totals.append(fee)
+            self._counts.append(count)
+            if self._stale_from is None:
+                previous_total = self._running_totals[-1] if self._running_totals else 0.0
+                previous_count = self._running_counts[-1] if self._running_counts else 0
+                self._running_totals.append(previous_total + fee)
+                self._running_counts.append(previous_count + count)
+            return
         
-        return date_appointments
-
-class SimulatedConsultation:
-    def __init__(self, fee: float):
-        self.fee = fee
+        if self._days[index] == day:
+            self._totals[index] += fee
+            self._counts[index] += count
+        else:
+            self._days.insert(index, day)
+            self._totals.insert(index, fee)
+            self._counts.insert(index, count)
+        if self._stale_from is None or index < self._stale_from:
+            self._stale_from = index
+    
+    def _refresh(self) -> None:
+        start = self._stale_from
+        if start is None:
+            return
+        
+        del self._running_totals[start:]
+        del self._running_counts[start:]
+        total = self._running_totals[-1] if self._running_totals else 0.0
+        count = self._running_counts[-1] if self._running_counts else 0
+        for index in range(start, len(self._days)):
+            total += self._totals[index]
+            count += self._counts[index]
+            self._running_totals.append(total)
+            self._running_counts.append(count)
+        self._stale_from = None
+    
+    def _range(self, start_date: date, end_date: date, running: List) -> float:
+        self._refresh()
+        first = bisect_left(self._days, start_date.toordinal())
+        last = bisect_right(self._days, end_date.toordinal()) - 1
+        if last < first:
+            return 0
+        return running[last] - (running[first - 1] if first else 0)
+    
+    def total_between(self, start_date: date, end_date: date) -> float:
+        return round(self._range(start_date, end_date, self._running_totals), 2)
+    
+    def count_between(self, start_date: date, end_date: date) -> int:
+        return self._range(start_date, end_date, self._running_counts)
 
 class Consultation:
+    __slots__ = ("_consultation_id", "_date", "_time", "_doctor", "_patient", "_diagnosis", "_treatment",
+                 "_applied_fee")
+    
     def __init__(self, consultation_id: str, date: date, time: time, doctor: Doctor, patient: Patient):
         self._consultation_id = consultation_id
         self._date = date
@@ -235,152 +835,1284 @@ class Consultation:
         self._treatment = "Under observation"
         self._applied_fee = doctor._consultation_fee
     
+    def get_id(self) -> str:
+        return self._consultation_id
+    
     def get_date(self) -> date:
         return self._date
     
+    def get_time(self) -> time:
+        return self._time
+    
     def get_doctor(self) -> Doctor:
         return self._doctor
     
+    def get_patient(self) -> Patient:
+        return self._patient
+    
     def get_diagnosis(self) -> str:
         return self._diagnosis
     
+    def get_treatment(self) -> str:
+        return self._treatment
+    
     def register_diagnosis(self, diagnosis: str) -> None:
         self._diagnosis = diagnosis
+        self._patient._notify("consultation_updated", self)
     
     def register_treatment(self, treatment: str) -> None:
         self._treatment = treatment
+        self._patient._notify("consultation_updated", self)
     
     def calculate_fee(self) -> float:
         return self._applied_fee
 
 class Appointment:
-    def __init__(self, appointment_id: str, date: date, time: time, doctor: Doctor, patient: Patient, consultation_type: str):
+    __slots__ = ("_appointment_id", "_date", "_time", "_doctor", "_patient", "_consultation_type",
+                 "_duration_minutes", "_start_minute", "_status", "_room")
+    
+    def __init__(self, appointment_id: str, date: date, time: time, doctor: Doctor, patient: Patient, consultation_type: str,
+                 duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES):
+        if duration_minutes <= 0:
+            raise ValueError("Appointment duration must be positive")
         self._appointment_id = appointment_id
         self._date = date
         self._time = time
         self._doctor = doctor
         self._patient = patient
-        self._consultation_type = consultation_type
+        self._consultation_type = sys.intern(consultation_type)
+        self._duration_minutes = duration_minutes
+        self._start_minute = minute_of_day(time)
         self._status = "Scheduled"
+        self._room = None
+    
+    def get_id(self) -> str:
+        return self._appointment_id
     
     def get_date(self) -> date:
         return self._date
     
+    def get_time(self) -> time:
+        return self._time
+    
     def get_date_time(self) -> datetime:
         return datetime.combine(self._date, self._time)
     
+    def get_duration(self) -> int:
+        return self._duration_minutes
+    
+    def get_start_minute(self) -> int:
+        return self._start_minute
+    
+    def get_end_minute(self) -> int:
+        return self._start_minute + self._duration_minutes
+    
+    def get_doctor(self) -> Doctor:
+        return self._doctor
+    
+    def get_room(self) -> Optional['ConsultingRoom']:
+        return self._room
+    
     def get_patient(self) -> Patient:
         return self._patient
     
+    def get_consultation_type(self) -> str:
+        return self._consultation_type
+    
+    def get_status(self) -> str:
+        return self._status
+    
     def confirm(self) -> None:
+        if self._status != "Scheduled":
+            return
         self._status = "Confirmed"
+        self._doctor._notify("appointment_confirmed", self)
     
     def cancel(self) -> None:
-        self._status = "Cancelled"
+        if self._status in INACTIVE_STATUSES:
+            return
+        self._doctor._cancel(self)
     
     def get_appointment_info(self) -> str:
+        room = f" | Room: {self._room.get_number()}" if self._room is not None else ""
         return (f"Appointment {self._appointment_id} | {self._date} {self._time.strftime('%H:%M')} | "
                 f"Patient: {self._patient.get_full_name()} | "
-                f"Doctor: {self._doctor.get_full_name()} | Status: {self._status}")
+                f"Doctor: {self._doctor.get_full_name()}{room} | Status: {self._status}")
+    
+    def to_dict(self) -> Dict:
+        return {
+            'id': self._appointment_id,
+            'date': self._date.isoformat(),
+            'time': self._time.strftime('%H:%M'),
+            'duration': self._duration_minutes,
+            'doctor_id': self._doctor.get_id(),
+            'patient_id': self._patient.get_id(),
+            'consultation_type': self._consultation_type,
+            'room': self._room.get_number() if self._room is not None else None,
+            'status': self._status
+        }
+
+class RecurrenceRule:
+    FREQUENCIES = ("daily", "weekly", "monthly")
+    MAX_OCCURRENCES = 520
+    
+    def __init__(self, frequency: str = "weekly", interval: int = 1, weekdays: Optional[List[int]] = None,
+                 until: Optional[date] = None, count: Optional[int] = None):
+        if frequency not in self.FREQUENCIES:
+            raise ValueError(f"Unknown recurrence frequency: {frequency}")
+        if interval < 1:
+            raise ValueError("Recurrence interval must be at least 1")
+        if until is None and count is None:
+            raise ValueError("A recurrence needs an end date or an occurrence count")
+        if count is not None and not 0 < count <= self.MAX_OCCURRENCES:
+            raise ValueError(f"Occurrence count must be between 1 and {self.MAX_OCCURRENCES}")
+        if weekdays and not all(0 <= weekday <= 6 for weekday in weekdays):
+            raise ValueError("Weekdays go from 0 (Monday) to 6 (Sunday)")
+        self._frequency = frequency
+        self._interval = interval
+        self._weekdays = sorted(set(weekdays)) if weekdays else []
+        self._until = until
+        self._count = count
+    
+    def get_frequency(self) -> str:
+        return self._frequency
+    
+    def get_interval(self) -> int:
+        return self._interval
+    
+    def get_weekdays(self) -> List[int]:
+        return list(self._weekdays)
+    
+    def get_until(self) -> Optional[date]:
+        return self._until
+    
+    def get_count(self) -> Optional[int]:
+        return self._count
+    
+    def _iter_candidates(self, start: date) -> Iterator[date]:
+        if self._frequency == "daily":
+            day = start
+            while True:
+                yield day
+                day += timedelta(days=self._interval)
+        
+        elif self._frequency == "weekly":
+            week = start - timedelta(days=start.weekday())
+            weekdays = self._weekdays or [start.weekday()]
+            while True:
+                for weekday in weekdays:
+                    day = week + timedelta(days=weekday)
+                    if day >= start:
+                        yield day
+                week += timedelta(weeks=self._interval)
+        
+        else:
+            months = start.year * 12 + start.month - 1
+            while True:
+                year, month = divmod(months, 12)
+                try:
+                    yield date(year, month + 1, start.day)
+                except ValueError:
+                    pass
+                months += self._interval
+    
+    def occurrences(self, start: date) -> List[date]:
+        days = []
+        for day in self._iter_candidates(start):
+            if self._until is not None and day > self._until:
+                break
+            days.append(day)
+            if len(days) == self._count:
+                break
+            if len(days) > self.MAX_OCCURRENCES:
+                raise ValueError(f"A series cannot have more than {self.MAX_OCCURRENCES} occurrences")
+        return days
+    
+    def to_dict(self) -> Dict:
+        return {
+            'frequency': self._frequency,
+            'interval': self._interval,
+            'weekdays': list(self._weekdays),
+            'until': self._until.isoformat() if self._until else None,
+            'count': self._count
+        }
+
+class AppointmentSeries:
+    def __init__(self, series_id: str, doctor: Doctor, patient: Patient, start_time: time, consultation_type: str,
+                 duration_minutes: int, rule: RecurrenceRule):
+        self._series_id = series_id
+        self._doctor = doctor
+        self._patient = patient
+        self._start_time = start_time
+        self._consultation_type = consultation_type
+        self._duration_minutes = duration_minutes
+        self._rule = rule
+        self._appointments: List[Appointment] = []
+        self._conflicts: List[Appointment] = []
+    
+    def get_id(self) -> str:
+        return self._series_id
+    
+    def get_doctor(self) -> Doctor:
+        return self._doctor
+    
+    def get_patient(self) -> Patient:
+        return self._patient
+    
+    def get_rule(self) -> RecurrenceRule:
+        return self._rule
+    
+    def get_time(self) -> time:
+        return self._start_time
+    
+    def get_duration(self) -> int:
+        return self._duration_minutes
+    
+    def get_appointments(self) -> List[Appointment]:
+        return [appointment for appointment in self._appointments if appointment.get_status() not in INACTIVE_STATUSES]
+    
+    def get_conflicts(self) -> List[Appointment]:
+        return list(self._conflicts)
+    
+    def _new_occurrences(self, days: List[date]) -> List[Appointment]:
+        return [Appointment(appointment_ids.next_id(), day, self._start_time, self._doctor, self._patient,
+                            self._consultation_type, self._duration_minutes) for day in days]
+    
+    def _pending_from(self, from_date: Optional[date]) -> List[Appointment]:
+        from_date = from_date or current_day()
+        return [appointment for appointment in self.get_appointments() if appointment.get_date() >= from_date]
+    
+    def cancel(self, from_date: Optional[date] = None) -> int:
+        pending = self._pending_from(from_date)
+        return self._doctor._cancel_many(pending)
+    
+    def reschedule(self, new_time: time, duration_minutes: Optional[int] = None, from_date: Optional[date] = None,
+                   atomic: bool = True) -> List[Appointment]:
+        pending = self._pending_from(from_date)
+        previous = (self._start_time, self._duration_minutes)
+        self._start_time = new_time
+        self._duration_minutes = duration_minutes or self._duration_minutes
+        replacements = self._new_occurrences([appointment.get_date() for appointment in pending])
+        
+        booked, conflicts = self._doctor._reschedule_many(pending, replacements, atomic)
+        if atomic and conflicts:
+            self._start_time, self._duration_minutes = previous
+        self._appointments.extend(booked)
+        self._conflicts = conflicts
+        return conflicts
+    
+    def get_series_info(self) -> str:
+        return (f"Series {self._series_id} | {self._rule.get_frequency()} every {self._rule.get_interval()} | "
+                f"{self._start_time.strftime('%H:%M')} | Patient: {self._patient.get_full_name()} | "
+                f"Doctor: {self._doctor.get_full_name()} | Appointments: {len(self.get_appointments())}")
+
+class FreeSlot(NamedTuple):
+    start: datetime
+    doctor: Doctor
+    duration_minutes: int
+    
+    def get_slot_info(self) -> str:
+        return (f"{self.start.strftime('%Y-%m-%d %H:%M')} | Dr. {self.doctor.get_full_name()} | "
+                f"{self.duration_minutes} min")
 
 class ConsultingRoom:
     def __init__(self, number: int, specialty: str):
         self._number = number
         self._specialty = specialty
         self._equipment = []
-        self._available = True
-        self._reservations = []
+        self._reservations: Dict[date, int] = {}
+        self._scheduler = None
+    
+    def get_number(self) -> int:
+        return self._number
+    
+    def get_specialty(self) -> str:
+        return self._specialty
     
-    def reserve(self, doctor: Doctor, date: date, time: time) -> bool:
-        if self._available and self._specialty == doctor._specialty:
-            self._available = False
-            self._reservations.append((doctor, date, time))
+    def reserve(self, doctor: Doctor, date: date, time: time,
+                duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> bool:
+        if self._specialty != doctor._specialty:
+            return False
+        if self._scheduler is not None:
+            return self._scheduler.reserve_room(self, date, time, duration_minutes)
+        
+        if not self.check_availability(date, time, duration_minutes):
+            return False
+        self._occupy(date, room_slot_mask(time, duration_minutes))
+        return True
+    
+    def release(self, date: date, time: time, duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> None:
+        if self._scheduler is not None:
+            self._scheduler.release_room(self, date, time, duration_minutes)
+        else:
+            self._vacate(date, room_slot_mask(time, duration_minutes))
+    
+    def check_availability(self, date: date, time: time,
+                           duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> bool:
+        return not self._reservations.get(date, 0) & room_slot_mask(time, duration_minutes)
+    
+    def _occupy(self, day: date, slots: int) -> None:
+        self._reservations[day] = self._reservations.get(day, 0) | slots
+    
+    def _vacate(self, day: date, slots: int) -> None:
+        remaining = self._reservations.get(day, 0) & ~slots
+        if remaining:
+            self._reservations[day] = remaining
+        else:
+            self._reservations.pop(day, None)
+
+class RoomScheduler:
+    def __init__(self):
+        self._rooms: Dict[str, List[ConsultingRoom]] = {}
+        self._positions: Dict[int, int] = {}
+        self._occupied: Dict[tuple, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+    
+    def add_room(self, room: ConsultingRoom) -> None:
+        with self._lock:
+            rooms = self._rooms.setdefault(room.get_specialty(), [])
+            self._positions[room.get_number()] = len(rooms)
+            rooms.append(room)
+            room._scheduler = self
+            for day, slots in room._reservations.items():
+                self._mark(room, day, slots, True)
+    
+    def has_rooms(self, specialty: str) -> bool:
+        return specialty in self._rooms
+    
+    def get_rooms(self, specialty: str) -> List[ConsultingRoom]:
+        return list(self._rooms.get(specialty, ()))
+    
+    def _mark(self, room: ConsultingRoom, day: date, slots: int, occupied: bool) -> None:
+        bit = 1 << self._positions[room.get_number()]
+        by_slot = self._occupied.setdefault((room.get_specialty(), day), {})
+        while slots:
+            lowest = slots & -slots
+            slot = lowest.bit_length() - 1
+            if occupied:
+                by_slot[slot] = by_slot.get(slot, 0) | bit
+            else:
+                remaining = by_slot.get(slot, 0) & ~bit
+                if remaining:
+                    by_slot[slot] = remaining
+                else:
+                    by_slot.pop(slot, None)
+            slots ^= lowest
+    
+    def _find_free(self, specialty: str, day: date, slots: int) -> Optional[ConsultingRoom]:
+        rooms = self._rooms.get(specialty)
+        if not rooms:
+            return None
+        
+        busy = 0
+        by_slot = self._occupied.get((specialty, day))
+        if by_slot:
+            while slots:
+                lowest = slots & -slots
+                busy |= by_slot.get(lowest.bit_length() - 1, 0)
+                slots ^= lowest
+        
+        free = ((1 << len(rooms)) - 1) & ~busy
+        if not free:
+            return None
+        return rooms[(free & -free).bit_length() - 1]
+    
+    def find_free_room(self, specialty: str, day: date, start_time: time,
+                       duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> Optional[ConsultingRoom]:
+        with self._lock:
+            return self._find_free(specialty, day, room_slot_mask(start_time, duration_minutes))
+    
+    def allocate(self, specialty: str, day: date, start_time: time,
+                 duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> Optional[ConsultingRoom]:
+        slots = room_slot_mask(start_time, duration_minutes)
+        with self._lock:
+            room = self._find_free(specialty, day, slots)
+            if room is not None:
+                room._occupy(day, slots)
+                self._mark(room, day, slots, True)
+            return room
+    
+    def reserve_room(self, room: ConsultingRoom, day: date, start_time: time,
+                     duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> bool:
+        slots = room_slot_mask(start_time, duration_minutes)
+        with self._lock:
+            if room._reservations.get(day, 0) & slots:
+                return False
+            room._occupy(day, slots)
+            self._mark(room, day, slots, True)
             return True
-        return False
     
-    def release(self) -> None:
-        self._available = True
+    def release_room(self, room: ConsultingRoom, day: date, start_time: time,
+                     duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> None:
+        with self._lock:
+            slots = room_slot_mask(start_time, duration_minutes) & room._reservations.get(day, 0)
+            room._vacate(day, slots)
+            self._mark(room, day, slots, False)
+    
+    def compact(self, before: date) -> None:
+        with self._lock:
+            for key in [key for key in self._occupied if key[1] < before]:
+                del self._occupied[key]
+            for rooms in self._rooms.values():
+                for room in rooms:
+                    for day in [day for day in room._reservations if day < before]:
+                        del room._reservations[day]
+
+class NameIndex:
+    GRAM_SIZE = 3
+    
+    def __init__(self):
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._pending: List[Patient] = []
+        self._dead = set()
+    
+    @classmethod
+    def _grams(cls, text: str) -> set:
+        size = cls.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+    
+    def add(self, patient: Patient) -> None:
+        self._pending.append(patient)
+    
+    def replace(self, patient: Patient, previous_name: str) -> None:
+        self.index_pending()
+        patient_id = patient.get_id()
+        current_name = patient.get_normalized_name()
+        indexed = False
+        for name in {previous_name, current_name}:
+            for ordinal in self._candidates(name):
+                if self._ids[ordinal] != patient_id or self._names[ordinal] != name or ordinal in self._dead:
+                    continue
+                if name == current_name and not indexed:
+                    indexed = True
+                else:
+                    self._dead.add(ordinal)
+        if not indexed:
+            self.add(patient)
+    
+    def index_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        postings = self._postings
+        for patient in pending:
+            ordinal = len(self._ids)
+            normalized = patient.get_normalized_name()
+            self._ids.append(patient.get_id())
+            self._names.append(normalized)
+            
+            for gram in self._grams(f" {normalized} "):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(ordinal)
+    
+    def _candidates(self, query: str):
+        if not query:
+            return range(len(self._ids))
+        
+        if len(query) < self.GRAM_SIZE:
+            ordinals = set()
+            for gram, posting in list(self._postings.items()):
+                if query in gram:
+                    ordinals.update(posting)
+            return ordinals
+        
+        postings = []
+        for gram in self._grams(query):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return ()
+            postings.append(posting)
+        return min(postings, key=len)
+    
+    @staticmethod
+    def _rank(name: str, query: str) -> int:
+        if name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        if f" {query}" in f" {name}":
+            return 2
+        return 3
+    
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        query = normalize_name(query)
+        names = self._names
+        dead = self._dead
+        ranked = ((self._rank(names[ordinal], query), names[ordinal], self._ids[ordinal])
+                  for ordinal in self._candidates(query)
+                  if query in names[ordinal] and ordinal not in dead)
+        
+        if limit is None:
+            matches = sorted(ranked)
+        else:
+            matches = heapq.nsmallest(limit, ranked)
+        return [patient_id for _, _, patient_id in matches]
+
+class RollingCounter:
+    def __init__(self, window_seconds: float, buckets: int = 60):
+        self._bucket_seconds = window_seconds / buckets
+        self._counts = [0] * buckets
+        self._current = 0
+        self._total = 0
+    
+    def _advance(self, now: float) -> None:
+        bucket = int(now // self._bucket_seconds)
+        expired = min(bucket - self._current, len(self._counts))
+        for step in range(1, expired + 1):
+            index = (self._current + step) % len(self._counts)
+            self._total -= self._counts[index]
+            self._counts[index] = 0
+        if bucket > self._current:
+            self._current = bucket
+    
+    def add(self, amount: int = 1, now: Optional[float] = None) -> None:
+        self._advance(clock.monotonic() if now is None else now)
+        self._counts[self._current % len(self._counts)] += amount
+        self._total += amount
+    
+    def get_total(self, now: Optional[float] = None) -> int:
+        self._advance(clock.monotonic() if now is None else now)
+        return self._total
+
+class ClinicMetrics:
+    ROOM_OPEN_MINUTES = 12 * 60
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._patients = 0
+        self._doctors = 0
+        self._rooms = 0
+        self._specialties: Dict[str, int] = {}
+        self._appointments = 0
+        self._confirmed = 0
+        self._cancelled = 0
+        self._revenue = 0.0
+        self._consultations = 0
+        self._daily_appointments: Dict[date, int] = {}
+        self._doctor_daily_appointments: Dict[Tuple[str, date], int] = {}
+        self._room_minutes: Dict[date, int] = {}
+        self._bookings_last_hour = RollingCounter(3600)
+        self._bookings_last_day = RollingCounter(86400)
+        self._registrations_last_hour = RollingCounter(3600)
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        handler = getattr(self, f"_on_{event}", None)
+        if handler is not None:
+            with self._lock:
+                handler(subject)
+    
+    def _on_patient_registered(self, patient: Patient) -> None:
+        self._patients += 1
+        self._registrations_last_hour.add()
+    
+    def _on_doctor_hired(self, doctor: Doctor) -> None:
+        self._doctors += 1
+        specialty = doctor.get_specialty()
+        self._specialties[specialty] = self._specialties.get(specialty, 0) + 1
+    
+    def _on_room_added(self, room: 'ConsultingRoom') -> None:
+        self._rooms += 1
+    
+    def _count_appointment(self, appointment: 'Appointment', delta: int) -> None:
+        day = appointment.get_date()
+        key = (appointment.get_doctor().get_id(), day)
+        self._daily_appointments[day] = self._daily_appointments.get(day, 0) + delta
+        self._doctor_daily_appointments[key] = self._doctor_daily_appointments.get(key, 0) + delta
+        if appointment.get_room() is not None:
+            self._room_minutes[day] = self._room_minutes.get(day, 0) + delta * appointment.get_duration()
+    
+    def _on_appointment_loaded(self, appointment: 'Appointment') -> None:
+        if appointment.get_status() == "Rescheduled":
+            return
+        self._appointments += 1
+        if appointment.get_status() == "Cancelled":
+            self._cancelled += 1
+            return
+        if appointment.get_status() == "Confirmed":
+            self._confirmed += 1
+        self._count_appointment(appointment, 1)
+    
+    _on_appointment_imported = _on_appointment_loaded
+    
+    def _on_appointment_scheduled(self, appointment: 'Appointment') -> None:
+        self._on_appointment_loaded(appointment)
+        self._bookings_last_hour.add()
+        self._bookings_last_day.add()
+    
+    def _on_appointment_confirmed(self, appointment: 'Appointment') -> None:
+        self._confirmed += 1
+    
+    def _on_appointment_cancelled(self, appointment: 'Appointment') -> None:
+        self._cancelled += 1
+        self._count_appointment(appointment, -1)
+    
+    def _on_appointment_rescheduled(self, appointment: 'Appointment') -> None:
+        self._appointments -= 1
+        self._count_appointment(appointment, -1)
+    
+    def _on_consultation_added(self, consultation: 'Consultation') -> None:
+        self._consultations += 1
+        self._revenue += consultation.calculate_fee()
+    
+    def add_loaded_totals(self, patients: int = 0, consultations: int = 0, revenue: float = 0.0) -> None:
+        with self._lock:
+            self._patients += patients
+            self._consultations += consultations
+            self._revenue += revenue
+    
+    def add_loaded_appointments(self, rows: Iterable[Tuple[date, str, str, int, int]]) -> None:
+        with self._lock:
+            for day, doctor_id, status, count, room_minutes in rows:
+                if status == "Rescheduled":
+                    continue
+                self._appointments += count
+                if status == "Cancelled":
+                    self._cancelled += count
+                    continue
+                if status == "Confirmed":
+                    self._confirmed += count
+                key = (doctor_id, day)
+                self._daily_appointments[day] = self._daily_appointments.get(day, 0) + count
+                self._doctor_daily_appointments[key] = self._doctor_daily_appointments.get(key, 0) + count
+                self._room_minutes[day] = self._room_minutes.get(day, 0) + room_minutes
+    
+    def get_appointment_count(self, doctor_id: str, day: date) -> int:
+        return self._doctor_daily_appointments.get((doctor_id, day), 0)
+    
+    def get_room_utilization(self, day: date) -> float:
+        if not self._rooms:
+            return 0.0
+        return self._room_minutes.get(day, 0) / (self._rooms * self.ROOM_OPEN_MINUTES)
+    
+    def snapshot(self) -> Dict:
+        today = date.today()
+        with self._lock:
+            return {
+                'total_patients': self._patients,
+                'total_doctors': self._doctors,
+                'total_consulting_rooms': self._rooms,
+                'specialties': list(self._specialties),
+                'total_appointments': self._appointments,
+                'confirmed_appointments': self._confirmed,
+                'cancelled_appointments': self._cancelled,
+                'cancellation_rate': round(self._cancelled / self._appointments, 4) if self._appointments else 0.0,
+                'appointments_today': self._daily_appointments.get(today, 0),
+                'room_utilization_today': round(self.get_room_utilization(today), 4),
+                'total_consultations': self._consultations,
+                'revenue_to_date': round(self._revenue, 2),
+                'bookings_last_hour': self._bookings_last_hour.get_total(),
+                'bookings_last_24h': self._bookings_last_day.get_total(),
+                'registrations_last_hour': self._registrations_last_hour.get_total()
+            }
+
+class PatientAppointmentIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_patient: Dict[str, List['Appointment']] = {}
+    
+    @staticmethod
+    def _sort_key(appointment: 'Appointment') -> Tuple[datetime, str]:
+        return appointment.get_date_time(), appointment.get_id()
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        handler = getattr(self, f"_on_{event}", None)
+        if handler is not None:
+            with self._lock:
+                handler(subject)
+    
+    def _on_appointment_loaded(self, appointment: 'Appointment') -> None:
+        if appointment.get_status() in INACTIVE_STATUSES:
+            return
+        appointments = self._by_patient.setdefault(appointment.get_patient().get_id(), [])
+        key = self._sort_key(appointment)
+        position = bisect_left(appointments, key, key=self._sort_key)
+        if position < len(appointments) and appointments[position] is appointment:
+            return
+        appointments.insert(position, appointment)
+    
+    _on_appointment_scheduled = _on_appointment_loaded
+    _on_appointment_imported = _on_appointment_loaded
+    
+    def _on_appointment_cancelled(self, appointment: 'Appointment') -> None:
+        patient_id = appointment.get_patient().get_id()
+        appointments = self._by_patient.get(patient_id)
+        if not appointments:
+            return
+        position = bisect_left(appointments, self._sort_key(appointment), key=self._sort_key)
+        if position < len(appointments) and appointments[position] is appointment:
+            del appointments[position]
+            if not appointments:
+                del self._by_patient[patient_id]
+    
+    _on_appointment_rescheduled = _on_appointment_cancelled
+    
+    def get_upcoming(self, patient_id: str, now: datetime, limit: Optional[int] = None) -> List['Appointment']:
+        with self._lock:
+            appointments = self._by_patient.get(patient_id, [])
+            start = bisect_left(appointments, (now, ""), key=self._sort_key)
+            end = len(appointments) if limit is None else min(len(appointments), start + limit)
+            return appointments[start:end]
+    
+    def get_past(self, patient_id: str, now: datetime, limit: Optional[int] = None) -> List['Appointment']:
+        with self._lock:
+            appointments = self._by_patient.get(patient_id, [])
+            end = bisect_left(appointments, (now, ""), key=self._sort_key)
+            start = 0 if limit is None else max(0, end - limit)
+            return appointments[start:end]
+    
+    def count(self, patient_id: str) -> int:
+        with self._lock:
+            return len(self._by_patient.get(patient_id, ()))
+
+class AppointmentArchive:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id: Dict[str, 'Appointment'] = {}
+    
+    def handle_event(self, event: str, subject: object) -> None:
+        handler = getattr(self, f"_on_{event}", None)
+        if handler is not None:
+            with self._lock:
+                handler(subject)
+    
+    def _on_appointment_loaded(self, appointment: 'Appointment') -> None:
+        if appointment.get_status() == "Cancelled":
+            self._by_id[appointment.get_id()] = appointment
+    
+    _on_appointment_imported = _on_appointment_loaded
+    
+    def _on_appointment_cancelled(self, appointment: 'Appointment') -> None:
+        self._by_id[appointment.get_id()] = appointment
+    
+    def add(self, appointments: List['Appointment']) -> None:
+        with self._lock:
+            for appointment in appointments:
+                self._by_id[appointment.get_id()] = appointment
+    
+    def get_appointments(self) -> List['Appointment']:
+        with self._lock:
+            return list(self._by_id.values())
+    
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+class WaitlistEntry:
+    __slots__ = ("_entry_id", "_patient", "_specialty", "_doctor", "_urgency", "_requested_at", "_earliest",
+                 "_latest", "_duration_minutes", "_consultation_type", "_appointment")
+    
+    def __init__(self, entry_id: str, patient: Patient, specialty: str, doctor: Optional[Doctor] = None,
+                 urgency: int = 0, requested_at: Optional[datetime] = None, earliest: Optional[datetime] = None,
+                 latest: Optional[datetime] = None, duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+                 consultation_type: str = "General consultation"):
+        if duration_minutes <= 0:
+            raise ValueError("Waitlist duration must be positive")
+        self._entry_id = entry_id
+        self._patient = patient
+        self._specialty = sys.intern(specialty)
+        self._doctor = doctor
+        self._urgency = urgency
+        self._requested_at = requested_at or datetime.now()
+        self._earliest = earliest
+        self._latest = latest
+        self._duration_minutes = duration_minutes
+        self._consultation_type = sys.intern(consultation_type)
+        self._appointment = None
+    
+    def get_id(self) -> str:
+        return self._entry_id
+    
+    def get_patient(self) -> Patient:
+        return self._patient
+    
+    def get_specialty(self) -> str:
+        return self._specialty
+    
+    def get_doctor(self) -> Optional[Doctor]:
+        return self._doctor
+    
+    def get_urgency(self) -> int:
+        return self._urgency
+    
+    def get_requested_at(self) -> datetime:
+        return self._requested_at
+    
+    def get_appointment(self) -> Optional['Appointment']:
+        return self._appointment
     
-    def check_availability(self, date: date, time: time) -> bool:
-        for reservation in self._reservations:
-            if reservation[1] == date and reservation[2] == time:
+    def get_priority(self) -> Tuple[int, datetime, str]:
+        return -self._urgency, self._requested_at, self._entry_id
+    
+    def get_queue(self) -> Tuple[str, str]:
+        if self._doctor is not None:
+            return "doctor", self._doctor.get_id()
+        return "specialty", self._specialty
+    
+    def is_expired(self, now: datetime) -> bool:
+        return self._latest is not None and self._latest < now
+    
+    def accepts(self, start: datetime) -> bool:
+        if self._earliest is not None and start < self._earliest:
+            return False
+        return self._latest is None or start <= self._latest
+    
+    def get_entry_info(self) -> str:
+        target = f"Dr. {self._doctor.get_full_name()}" if self._doctor is not None else self._specialty
+        return (f"Waitlist {self._entry_id} | Patient: {self._patient.get_full_name()} | {target} | "
+                f"Urgency: {self._urgency} | Requested: {self._requested_at.strftime('%Y-%m-%d %H:%M')}")
+
+class Waitlist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], List[WaitlistEntry]] = {}
+        self._entries: Dict[str, WaitlistEntry] = {}
+    
+    def add(self, entry: WaitlistEntry) -> None:
+        with self._lock:
+            insort(self._queues.setdefault(entry.get_queue(), []), entry, key=WaitlistEntry.get_priority)
+            self._entries[entry.get_id()] = entry
+    
+    def remove(self, entry_id: str) -> Optional[WaitlistEntry]:
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return None
+            queue = self._queues[entry.get_queue()]
+            del queue[bisect_left(queue, entry.get_priority(), key=WaitlistEntry.get_priority)]
+            if not queue:
+                del self._queues[entry.get_queue()]
+            return entry
+    
+    def get(self, entry_id: str) -> Optional[WaitlistEntry]:
+        return self._entries.get(entry_id)
+    
+    def get_entries(self, queue: Optional[Tuple[str, str]] = None) -> List[WaitlistEntry]:
+        with self._lock:
+            if queue is not None:
+                return list(self._queues.get(queue, ()))
+            return sorted(self._entries.values(), key=WaitlistEntry.get_priority)
+    
+    def candidates(self, doctor: Doctor) -> Iterator[WaitlistEntry]:
+        with self._lock:
+            queues = [list(self._queues.get(("doctor", doctor.get_id()), ())),
+                      list(self._queues.get(("specialty", doctor.get_specialty()), ()))]
+        return heapq.merge(*queues, key=WaitlistEntry.get_priority)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+PATIENT_ORDERS = ("id", "name")
+
+def patient_cursor(patient: Patient, order_by: str = "id") -> str:
+    if order_by == "name":
+        return f"{patient.get_normalized_name()}\t{patient.get_id()}"
+    return patient.get_id()
+
+class PatientRegistry:
+    def __init__(self):
+        self._by_id: Dict[str, Patient] = {}
+        self._sorted_ids: List[str] = []
+        self._unsorted_ids: List[str] = []
+        self._name_order: Optional[List[str]] = None
+        self._unsorted_names: List[str] = []
+        self._names = NameIndex()
+        self._storage = None
+        self._clinic = None
+        self._lock = threading.Lock()
+    
+    def attach_storage(self, storage: 'ClinicStorage', clinic: 'Clinic') -> None:
+        self._storage = storage
+        self._clinic = clinic
+        self._by_id = WeakValueDictionary()
+        self._sorted_ids = []
+        self._unsorted_ids = []
+        self._name_order = None
+        self._unsorted_names = []
+        self._names = NameIndex()
+    
+    def add(self, patient: Patient) -> bool:
+        with self._lock:
+            return self._add(patient)
+    
+    def _add(self, patient: Patient) -> bool:
+        patient_id = patient.get_id()
+        if patient_id in self._by_id:
+            return False
+        
+        if self._storage is not None:
+            if self._storage.has_patient(patient_id):
                 return False
-        return self._available
+            self._by_id[patient_id] = patient
+            return True
+        
+        self._by_id[patient_id] = patient
+        if not self._unsorted_ids and (not self._sorted_ids or self._sorted_ids[-1] < patient_id):
+            self._sorted_ids.append(patient_id)
+        else:
+            self._unsorted_ids.append(patient_id)
+        if self._name_order is not None:
+            self._unsorted_names.append(patient_id)
+        self._names.add(patient)
+        return True
+    
+    def _rename(self, patient: Patient, previous_name: str) -> None:
+        if self._storage is not None:
+            return
+        with self._lock:
+            self._names.replace(patient, previous_name)
+            self._name_order = None
+            self._unsorted_names = []
+    
+    def _ordered_ids(self) -> List[str]:
+        if self._unsorted_ids:
+            merged = self._sorted_ids + self._unsorted_ids
+            merged.sort()
+            self._sorted_ids = merged
+            self._unsorted_ids = []
+        return self._sorted_ids
+    
+    def _ordered_names(self) -> List[str]:
+        if self._name_order is None:
+            self._name_order = sorted(self._by_id, key=self._name_key)
+        elif self._unsorted_names:
+            merged = self._name_order + self._unsorted_names
+            merged.sort(key=self._name_key)
+            self._name_order = merged
+            self._unsorted_names = []
+        return self._name_order
+    
+    def _name_key(self, patient_id: str) -> Tuple[str, str]:
+        return self._by_id[patient_id].get_normalized_name(), patient_id
+    
+    def _page_ids(self, order_by: str, after: Optional[str], batch_size: int) -> List[str]:
+        if order_by == "id":
+            ordered = self._ordered_ids()
+            start = 0 if after is None else bisect_right(ordered, after)
+            return ordered[start:start + batch_size]
+        
+        ordered = self._ordered_names()
+        start = 0
+        if after is not None:
+            name, _, patient_id = after.partition("\t")
+            start = bisect_right(ordered, (name, patient_id), key=self._name_key)
+        return ordered[start:start + batch_size]
+    
+    def iter_ids(self, order_by: str = "id", after: Optional[str] = None, batch_size: int = 1000) -> Iterator[str]:
+        if order_by not in PATIENT_ORDERS:
+            raise ValueError(f"Unknown patient order: {order_by}")
+        if self._storage is not None:
+            yield from self._storage.iter_patient_ids(batch_size, order_by, after)
+            return
+        
+        while True:
+            with self._lock:
+                batch = self._page_ids(order_by, after, batch_size)
+                if batch:
+                    after = patient_cursor(self._by_id[batch[-1]], order_by)
+            if not batch:
+                return
+            yield from batch
+    
+    def _peek_many(self, patient_ids: List[str]) -> List[Patient]:
+        found = [self._by_id.get(patient_id) for patient_id in patient_ids]
+        if self._storage is None:
+            return [patient for patient in found if patient is not None]
+        
+        missing = [patient_id for patient_id, patient in zip(patient_ids, found) if patient is None]
+        if not missing:
+            return found
+        loaded = {patient.get_id(): patient for patient in self._storage.load_patients(missing, self._clinic)}
+        patients = [patient or loaded.get(patient_id) for patient_id, patient in zip(patient_ids, found)]
+        return [patient for patient in patients if patient is not None]
+    
+    def get(self, patient_id: str) -> Optional[Patient]:
+        patient = self._by_id.get(patient_id)
+        if patient is None and self._storage is not None:
+            patient = self._storage.load_patient(patient_id, self._clinic)
+            if patient is not None:
+                self._by_id[patient_id] = patient
+        return patient
+    
+    def search_by_name(self, name: str, limit: Optional[int] = None) -> List[Patient]:
+        if self._storage is not None:
+            return [self.get(patient_id) for patient_id in self._storage.search_patient_ids(name, limit)]
+        with self._lock:
+            self._names.index_pending()
+        return [self._by_id[patient_id] for patient_id in self._names.search(name, limit)]
+    
+    def __contains__(self, patient_id: str) -> bool:
+        if patient_id in self._by_id:
+            return True
+        return self._storage is not None and self._storage.has_patient(patient_id)
+    
+    def __len__(self) -> int:
+        if self._storage is not None:
+            return self._storage.count_patients()
+        return len(self._by_id)
+    
+    def __iter__(self) -> Iterator[Patient]:
+        if self._storage is not None:
+            for patient in self._storage.iter_patients(self._clinic):
+                yield self._by_id.get(patient.get_id()) or patient
+            return
+        
+        with self._lock:
+            ordered = self._ordered_ids()
+        by_id = self._by_id
+        for patient_id in ordered:
+            yield by_id[patient_id]
 
 class Clinic:
-    def __init__(self, name: str, address: str):
+    def __init__(self, name: str, address: str, storage: Optional['ClinicStorage'] = None):
         self._name = name
         self._address = address
-        self._patients = []
+        self._patients = PatientRegistry()
         self._doctors = []
+        self._doctors_by_id: Dict[str, Doctor] = {}
+        self._doctors_by_specialty: Dict[str, List[Doctor]] = {}
         self._secretaries = []
         self._consulting_rooms = []
-        self._patients_sorted = False
+        self._room_scheduler = RoomScheduler()
+        self._metrics = ClinicMetrics()
+        self._appointment_index = PatientAppointmentIndex()
+        self._archive = AppointmentArchive()
+        self._waitlist = Waitlist()
+        self._compaction_stop = None
+        self._compactor = None
+        self._listeners: List[Callable[[str, object], None]] = [self._metrics.handle_event,
+                                                                self._appointment_index.handle_event,
+                                                                self._archive.handle_event]
+        self._storage = None
+        if storage is not None:
+            self.attach_storage(storage)
+    
+    def add_listener(self, listener: Callable[[str, object], None]) -> None:
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, object], None]) -> None:
+        self._listeners.remove(listener)
+    
+    def _notify(self, event: str, subject: object) -> None:
+        for listener in self._listeners:
+            listener(event, subject)
+    
+    def _notify_loaded(self, event: str, subject: object) -> None:
+        self._metrics.handle_event(event, subject)
+        self._appointment_index.handle_event(event, subject)
+        self._archive.handle_event(event, subject)
+    
+    def attach_storage(self, storage: 'ClinicStorage') -> None:
+        self._storage = storage
+        self._patients.attach_storage(storage, self)
+        storage.load_into(self)
+        self.add_listener(storage.handle_event)
+    
+    def transaction(self) -> ContextManager:
+        if self._storage is None:
+            return nullcontext()
+        return self._storage.transaction()
+    
+    def close(self) -> None:
+        self.stop_compaction()
+        if self._storage is not None:
+            self._storage.close()
     
     def register_patient(self, patient: Patient) -> bool:
-        for p in self._patients:
-            if p.get_id() == patient.get_id():
-                return False
+        if not self._register(patient):
+            return False
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Patient %s registered successfully", patient.get_full_name())
+        return True
+    
+    def _register(self, patient: Patient) -> bool:
+        if not self._patients.add(patient):
+            return False
         
-        self._patients.append(patient)
-        self._patients_sorted = False
-        print(f"✓ Patient {patient.get_full_name()} registered successfully")
+        patient._clinic = self
+        if patient._registered_on is None:
+            patient._registered_on = current_day()
+        self._notify("patient_registered", patient)
         return True
     
-    def _sort_patients(self) -> None:
-        if not self._patients_sorted:
-            self._patients.sort(key=lambda p: p.get_id())
-            self._patients_sorted = True
+    def _is_stored_slot_taken(self, appointment: 'Appointment') -> bool:
+        storage = self._storage
+        if storage is None or appointment.get_date() >= max(current_day(), storage.get_loaded_from() or date.min):
+            return False
+        start = appointment._start_minute
+        return storage.has_slot(appointment.get_doctor().get_id(), appointment.get_date(), start,
+                                start + appointment.get_duration())
     
     def find_patient_by_id(self, patient_id: str) -> Optional[Patient]:
-        if not self._patients:
-            return None
-        
-        self._sort_patients()
-        
-        left = 0
-        right = len(self._patients) - 1
-        
-        while left <= right:
-            mid = (left + right) // 2
-            mid_patient = self._patients[mid]
-            
-            if mid_patient.get_id() == patient_id:
-                return mid_patient
-            elif mid_patient.get_id() < patient_id:
-                left = mid + 1
-            else:
-                right = mid - 1
-        
-        return None
+        return self._patients.get(patient_id)
     
-    def find_patient_by_name(self, name: str) -> List[Patient]:
-        results = []
-        name_lower = name.lower()
-        
-        for patient in self._patients:
-            if name_lower in patient.get_full_name().lower():
-                results.append(patient)
-        
-        return results
+    def find_patient_by_name(self, name: str, limit: Optional[int] = None) -> List[Patient]:
+        return self._patients.search_by_name(name, limit)
     
     def hire_doctor(self, doctor: Doctor) -> bool:
-        self._doctors.append(doctor)
-        print(f"✓ Dr. {doctor.get_full_name()} hired successfully")
+        self._add_doctor(doctor)
+        self._notify("doctor_hired", doctor)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Dr. %s hired successfully", doctor.get_full_name())
         return True
     
+    def _add_doctor(self, doctor: Doctor) -> None:
+        self._doctors.append(doctor)
+        self._doctors_by_id[doctor.get_id()] = doctor
+        self._doctors_by_specialty.setdefault(doctor.get_specialty(), []).append(doctor)
+        doctor._clinic = self
+    
+    def find_doctor_by_id(self, doctor_id: str) -> Optional[Doctor]:
+        return self._doctors_by_id.get(doctor_id)
+    
+    def get_doctors_by_specialty(self, specialty: str) -> List[Doctor]:
+        return list(self._doctors_by_specialty.get(specialty, ()))
+    
+    def find_available_slots(self, specialty: str, start: datetime, end: datetime,
+                             duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES, count: int = 5,
+                             step_minutes: int = ROOM_SLOT_MINUTES) -> List[FreeSlot]:
+        def tagged(index: int, doctor: Doctor):
+            for slot_start in doctor.iter_free_slots(start, end, duration_minutes, step_minutes):
+                yield slot_start, index, doctor
+        
+        doctors = self._doctors_by_specialty.get(specialty, ())
+        candidates = heapq.merge(*(tagged(index, doctor) for index, doctor in enumerate(doctors)))
+        needs_room = self._room_scheduler.has_rooms(specialty)
+        
+        slots = []
+        for slot_start, _, doctor in candidates:
+            if needs_room and self._room_scheduler.find_free_room(
+                    specialty, slot_start.date(), slot_start.time(), duration_minutes) is None:
+                continue
+            slots.append(FreeSlot(slot_start, doctor, duration_minutes))
+            if len(slots) >= count:
+                break
+        return slots
+    
     def add_consulting_room(self, consulting_room: ConsultingRoom) -> None:
         self._consulting_rooms.append(consulting_room)
-        print(f"✓ Consulting room {consulting_room._number} ({consulting_room._specialty}) added")
+        self._room_scheduler.add_room(consulting_room)
+        self._notify("room_added", consulting_room)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Consulting room %d (%s) added", consulting_room._number, consulting_room._specialty)
+    
+    def find_free_room(self, specialty: str, date: date, time: time,
+                       duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> Optional[ConsultingRoom]:
+        return self._room_scheduler.find_free_room(specialty, date, time, duration_minutes)
+    
+    def _assign_room(self, appointment: 'Appointment') -> bool:
+        specialty = appointment.get_doctor().get_specialty()
+        if not self._room_scheduler.has_rooms(specialty):
+            return True
+        
+        room = self._room_scheduler.allocate(specialty, appointment.get_date(), appointment.get_time(),
+                                             appointment.get_duration())
+        if room is None:
+            return False
+        appointment._room = room
+        return True
+    
+    def add_to_waitlist(self, patient: Patient, specialty: Optional[str] = None, doctor: Optional[Doctor] = None,
+                        urgency: int = 0, earliest: Optional[datetime] = None, latest: Optional[datetime] = None,
+                        duration_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+                        consultation_type: str = "General consultation") -> WaitlistEntry:
+        if doctor is not None:
+            specialty = doctor.get_specialty()
+        if specialty is None:
+            raise ValueError("A waitlist entry needs a doctor or a specialty")
+        entry = WaitlistEntry(waitlist_ids.next_id(), patient, specialty, doctor, urgency, None, earliest, latest,
+                              duration_minutes, consultation_type)
+        self._waitlist.add(entry)
+        self._notify("waitlist_added", entry)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ %s added to the waitlist. Waiting: %d", patient.get_full_name(), len(self._waitlist))
+        return entry
+    
+    def remove_from_waitlist(self, entry_id: str) -> bool:
+        entry = self._waitlist.remove(entry_id)
+        if entry is None:
+            return False
+        self._notify("waitlist_removed", entry)
+        return True
+    
+    def get_waitlist(self, specialty: Optional[str] = None, doctor_id: Optional[str] = None) -> List[WaitlistEntry]:
+        if doctor_id is not None:
+            return self._waitlist.get_entries(("doctor", doctor_id))
+        if specialty is not None:
+            return self._waitlist.get_entries(("specialty", specialty))
+        return self._waitlist.get_entries()
+    
+    def _offer_slot(self, freed: 'Appointment') -> Optional['Appointment']:
+        start = freed.get_date_time()
+        now = datetime.now()
+        if start <= now or not len(self._waitlist):
+            return None
+        
+        doctor = freed.get_doctor()
+        for entry in self._waitlist.candidates(doctor):
+            if entry.is_expired(now):
+                self.remove_from_waitlist(entry.get_id())
+                continue
+            if not entry.accepts(start) or self._waitlist.remove(entry.get_id()) is None:
+                continue
+            
+            appointment = Appointment(appointment_ids.next_id(), freed.get_date(), freed.get_time(), doctor,
+                                      entry.get_patient(), entry._consultation_type, entry._duration_minutes)
+            if doctor._book(appointment):
+                entry._appointment = appointment
+                self._notify("waitlist_filled", entry)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("✓ Freed slot %s offered to waitlisted patient %s",
+                                start.strftime('%Y-%m-%d %H:%M'), entry.get_patient().get_full_name())
+                return appointment
+            self._waitlist.add(entry)
+        return None
+    
+    def compact_schedules(self, before: Optional[date] = None) -> List['Appointment']:
+        before = before or current_day()
+        archived = []
+        for doctor in list(self._doctors):
+            archived.extend(doctor._archive_before(before))
+        self._room_scheduler.compact(before)
+        self._archive.add(archived)
+        return archived
+    
+    def start_compaction(self, interval_seconds: float = 3600.0,
+                         archive: Optional[Callable[[List['Appointment']], None]] = None) -> None:
+        if self._compactor is not None:
+            return
+        self._compaction_stop = threading.Event()
+        self._compactor = threading.Thread(target=self._compact_loop,
+                                           args=(self._compaction_stop, interval_seconds, archive),
+                                           name="clinic-compaction", daemon=True)
+        self._compactor.start()
+    
+    def _compact_loop(self, stop: threading.Event, interval_seconds: float,
+                      archive: Optional[Callable[[List['Appointment']], None]]) -> None:
+        while not stop.wait(interval_seconds):
+            archived = self.compact_schedules()
+            if archive is not None and archived:
+                archive(archived)
+    
+    def stop_compaction(self) -> None:
+        if self._compactor is None:
+            return
+        self._compaction_stop.set()
+        self._compactor.join()
+        self._compactor = None
     
     def generate_payment_reports(self, start_date: date, end_date: date) -> Dict:
         reports = {}
         
         for doctor in self._doctors:
-            payment = doctor.calculate_payment(start_date, end_date)
+            with doctor._lock:
+                payment = doctor._ledger.total_between(start_date, end_date)
+                consultations = doctor._ledger.count_between(start_date, end_date)
             reports[doctor.get_id()] = {
                 'doctor': doctor.get_full_name(),
                 'specialty': doctor._specialty,
+                'consultations': consultations,
                 'payment': payment,
                 'period': f"{start_date} to {end_date}"
             }
@@ -388,20 +2120,80 @@ class Clinic:
         return reports
     
     def get_operational_metrics(self) -> Dict:
-        return {
-            'total_patients': len(self._patients),
-            'total_doctors': len(self._doctors),
-            'total_secretaries': len(self._secretaries),
-            'total_consulting_rooms': len(self._consulting_rooms),
-            'specialties': list(set([doctor._specialty for doctor in self._doctors]))
-        }
-    
-    def show_all_patients(self) -> None:
+        metrics = self._metrics.snapshot()
+        metrics['total_secretaries'] = len(self._secretaries)
+        return metrics
+    
+    def get_patient_ages(self, day: Optional[date] = None) -> Dict[str, int]:
+        return compute_ages(iter(self._patients), day)
+    
+    def get_daily_appointment_count(self, doctor_id: str, day: date) -> int:
+        return self._metrics.get_appointment_count(doctor_id, day)
+    
+    def get_upcoming_appointments(self, patient_id: str, now: Optional[datetime] = None,
+                                  limit: Optional[int] = None) -> List['Appointment']:
+        return self._appointment_index.get_upcoming(patient_id, now or datetime.now(), limit)
+    
+    def get_past_appointments(self, patient_id: str, now: Optional[datetime] = None,
+                              limit: Optional[int] = None) -> List['Appointment']:
+        return self._appointment_index.get_past(patient_id, now or datetime.now(), limit)
+    
+    def get_archived_appointments(self) -> List['Appointment']:
+        return self._archive.get_appointments()
+    
+    def iter_patients(self, order_by: str = "id", after: Optional[str] = None,
+                      min_age: Optional[int] = None, max_age: Optional[int] = None,
+                      registered_from: Optional[date] = None,
+                      registered_to: Optional[date] = None) -> Iterator[Patient]:
+        today = current_day()
+        patient_ids = self._patients.iter_ids(order_by, after)
+        while True:
+            batch = list(itertools.islice(patient_ids, 500))
+            if not batch:
+                return
+            yield from self._filter_patients(self._patients._peek_many(batch), today, min_age, max_age,
+                                             registered_from, registered_to)
+    
+    def _filter_patients(self, patients: List[Patient], today: date, min_age: Optional[int], max_age: Optional[int],
+                         registered_from: Optional[date], registered_to: Optional[date]) -> Iterator[Patient]:
+        for patient in patients:
+            if min_age is not None or max_age is not None:
+                age = age_on(patient._birth_date, today)
+                if (min_age is not None and age < min_age) or (max_age is not None and age > max_age):
+                    continue
+            if registered_from is not None or registered_to is not None:
+                registered = patient._registered_on
+                if (registered is None or (registered_from is not None and registered < registered_from)
+                        or (registered_to is not None and registered > registered_to)):
+                    continue
+            yield patient
+    
+    def list_patients(self, limit: int = 50, cursor: Optional[str] = None, order_by: str = "id",
+                      min_age: Optional[int] = None, max_age: Optional[int] = None,
+                      registered_from: Optional[date] = None,
+                      registered_to: Optional[date] = None) -> Tuple[List[Patient], Optional[str]]:
+        patients = self.iter_patients(order_by, cursor, min_age, max_age, registered_from, registered_to)
+        page = list(itertools.islice(patients, limit))
+        next_cursor = patient_cursor(page[-1], order_by) if page and len(page) == limit else None
+        return page, next_cursor
+    
+    def show_all_patients(self, order_by: str = "id") -> None:
         print(f"\n--- REGISTERED PATIENTS ({len(self._patients)}) ---")
-        for i, patient in enumerate(self._patients, 1):
+        for i, patient in enumerate(self.iter_patients(order_by), 1):
             print(f"{i}. {patient.get_complete_info()}")
 
 def demonstrate_system():
+    owns_console = _console_handler is None
+    level = logger.level
+    enable_console_output()
+    try:
+        _run_demonstration()
+    finally:
+        if owns_console:
+            disable_console_output()
+            logger.setLevel(level)
+
+def _run_demonstration():
     print("=== CLINISOFT SYSTEM - DEMONSTRATION ===\n")
     
     clinic = Clinic("Marbella Clinic", "Lima, Peru")
@@ -419,6 +2211,10 @@ def demonstrate_system():
     clinic.hire_doctor(dr_garcia)
     clinic.hire_doctor(dra_rodriguez)
     
+    for weekday in range(5):
+        dr_garcia.set_working_hours(weekday, [(time(8, 0), time(13, 0))])
+        dra_rodriguez.set_working_hours(weekday, [(time(14, 0), time(18, 0))])
+    
     secretary_maria = Secretary("S001", "María", "López", "mlopez@marbellaclinic.com", 
                                  "987654323", "Morning", "Admission")
     clinic._secretaries.append(secretary_maria)
@@ -471,6 +2267,10 @@ def demonstrate_system():
     else:
         print("✗ Could not schedule appointment")
     
+    print("\nNext free Cardiology slots from 2024-01-22:")
+    for slot in clinic.find_available_slots("Cardiology", datetime(2024, 1, 22), datetime(2024, 2, 22), count=3):
+        print(f"  - {slot.get_slot_info()}")
+    
     print("\n5. POLYMORPHISM DEMONSTRATION:")
     print("-" * 40)
     
@@ -488,20 +2288,30 @@ def demonstrate_system():
     print(f"Total consulting rooms: {metrics['total_consulting_rooms']}")
     print(f"Specialties: {', '.join(metrics['specialties'])}")
     
-    print("\n7. PAYMENT CALCULATION (Recursive):")
+    print("\n7. PAYMENT CALCULATION:")
     print("-" * 40)
     
+    for day in (date(2024, 1, 20), date(2024, 1, 27), date(2024, 2, 3)):
+        consultation = Consultation(f"K{day.strftime('%Y%m%d')}", day, time(10, 0), dr_garcia, patient1)
+        patient1.add_consultation(consultation)
+    
     payment = dr_garcia.calculate_payment(date(2024, 1, 1), date(2024, 1, 31))
     print(f"Dr. García's payment: S/.{payment:.2f}")
     
     print("\n=== DEMONSTRATION COMPLETED ===")
 
-def main_menu():
-    clinic = Clinic("Marbella Clinic", "Lima, Peru")
-    
-    dr_example = Doctor("M001", "Carlos", "García", "cgarcia@marbellaclinic.com", 
-                       "987654321", "Cardiology", 150.0)
-    clinic.hire_doctor(dr_example)
+def main_menu(clinic: Optional[Clinic] = None):
+    enable_console_output()
+    if clinic is None:
+        clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    
+    dr_example = clinic.find_doctor_by_id("M001")
+    if dr_example is None:
+        dr_example = Doctor("M001", "Carlos", "García", "cgarcia@marbellaclinic.com", 
+                           "987654321", "Cardiology", 150.0)
+        clinic.hire_doctor(dr_example)
+        for weekday in range(5):
+            dr_example.set_working_hours(weekday, [(time(8, 0), time(13, 0)), (time(14, 0), time(18, 0))])
     
     while True:
         print("\n" + "="*50)
@@ -535,7 +2345,7 @@ def main_menu():
                     print("✓ Patient registered successfully")
                 else:
                     print("✗ Error: Patient with that ID already exists")
-                    
+            
             except ValueError:
                 print("✗ Error: Incorrect date format. Use YYYY-MM-DD")
         
@@ -575,7 +2385,7 @@ def main_menu():
             if not clinic._patients:
                 print("✗ First register patients")
                 continue
-                
+            
             patient_id = input("Patient ID: ").strip()
             patient = clinic.find_patient_by_id(patient_id)
             
@@ -583,33 +2393,43 @@ def main_menu():
                 print("✗ Patient not found")
                 continue
             
-            doctor = dr_example
-            date_str = input("Appointment date (YYYY-MM-DD): ").strip()
-            time_str = input("Appointment time (HH:MM): ").strip()
-            consultation_type = input("Consultation type: ").strip()
+            specialties = sorted(clinic._doctors_by_specialty)
+            specialty = input(f"Specialty ({', '.join(specialties)}): ").strip()
+            date_str = input("Earliest date (YYYY-MM-DD, empty for today): ").strip()
             
             try:
-                appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                appointment_time = datetime.strptime(time_str, "%H:%M").time()
+                earliest = datetime.strptime(date_str, "%Y-%m-%d") if date_str else datetime.now()
+                slots = clinic.find_available_slots(specialty, earliest, earliest + timedelta(days=60))
+                
+                if not slots:
+                    print("✗ No free slots in the next 60 days for that specialty")
+                    continue
+                
+                for i, slot in enumerate(slots, 1):
+                    print(f"{i}. {slot.get_slot_info()}")
+                slot = slots[int(input("Choose a slot: ").strip()) - 1]
+                consultation_type = input("Consultation type: ").strip()
                 
                 temp_secretary = Secretary("S999", "Temp", "Temp", "temp@temp.com", 
                                            "000000000", "Morning", "Temporary")
                 
-                appointment = temp_secretary.schedule_medical_appointment(doctor, patient, appointment_date, appointment_time, consultation_type)
+                appointment = temp_secretary.schedule_medical_appointment(
+                    slot.doctor, patient, slot.start.date(), slot.start.time(), consultation_type, slot.duration_minutes)
                 
                 if appointment:
                     print(f"✓ Appointment scheduled successfully:")
                     print(f"  {appointment.get_appointment_info()}")
                 else:
-                    print("✗ Could not schedule appointment (doctor not available)")
-                    
-            except ValueError as e:
-                print(f"✗ Error in date/time format: {e}")
+                    print("✗ Could not schedule appointment (slot was just taken)")
+            
+            except (ValueError, IndexError) as e:
+                print(f"✗ Invalid date or slot selection: {e}")
         
         elif option == "7":
             demonstrate_system()
         
         elif option == "8":
+            clinic.close()
             print("Thank you for using CliniSoft!")
             break
         
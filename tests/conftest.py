@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+import logging
+
+import pytest
+
+from Clinic_System import Clinic, Doctor, Patient
+
+@pytest.fixture(autouse=True)
+def quiet_clinic_logger():
+    logger = logging.getLogger("clinisoft")
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    yield
+    logger.setLevel(level)
+
+@pytest.fixture
+def monday() -> date:
+    day = date.today() + timedelta(days=1)
+    return day + timedelta(days=-day.weekday() % 7)
+
+@pytest.fixture
+def doctor() -> Doctor:
+    return Doctor("M001", "Ana", "Torres", "ana@clinic.com", "999111222", "Cardiology", 100.0)
+
+@pytest.fixture
+def patient() -> Patient:
+    return Patient("P001", "Luis", "Rojas", "luis@mail.com", "999333444", date(1990, 5, 1))
+
+@pytest.fixture
+def clinic(doctor: Doctor, patient: Patient) -> Clinic:
+    clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    clinic.hire_doctor(doctor)
+    clinic.register_patient(patient)
+    yield clinic
+    clinic.close()
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from Clinic_Analytics import AnalyticsSnapshot
+from Clinic_Import import import_appointments
+from Clinic_Storage import SQLiteStorage
+from Clinic_System import Clinic
+
+def test_rescheduled_rows_import_and_bin_separately(tmp_path, monday, doctor, patient):
+    clinic = Clinic("Marbella Clinic", "Lima, Peru", SQLiteStorage(str(tmp_path / "clinic.db")))
+    clinic.hire_doctor(doctor)
+    clinic.register_patient(patient)
+    source = tmp_path / "appointments.csv"
+    past = monday - timedelta(days=7)
+    source.write_text("id,doctor_id,patient_id,date,time,consultation_type,status\n"
+                      f"A1,M001,P001,{past},09:00,Checkup,Rescheduled\n"
+                      f"A2,M001,P001,{past},10:00,Checkup,Scheduled\n"
+                      f"A3,M001,P001,{monday},09:00,Checkup,Cancelled\n", encoding="utf-8")
+    
+    report = import_appointments(clinic, str(source))
+    assert (report.imported, report.rejected) == (3, 0)
+    assert clinic.get_daily_appointment_count("M001", past) == 1
+    metrics = clinic.get_operational_metrics()
+    assert (metrics['total_appointments'], metrics['cancelled_appointments']) == (2, 1)
+    
+    rates = AnalyticsSnapshot.from_storage(clinic._storage).status_rates(as_of=monday)['Cardiology']
+    assert (rates['appointments'], rates['cancelled'], rates['rescheduled'], rates['no_shows']) == (2, 1, 1, 1)
+    clinic.close()
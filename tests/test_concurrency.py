@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time
+import threading
+
+from Clinic_System import ConsultingRoom, Doctor, Secretary
+
+def test_concurrent_booking_never_double_books(clinic, doctor, patient, monday):
+    other = Doctor("M002", "Raul", "Vega", "raul@clinic.com", "999555666", "Cardiology", 120.0)
+    clinic.hire_doctor(other)
+    clinic.add_consulting_room(ConsultingRoom(101, "Cardiology"))
+    secretary = Secretary("S001", "Rosa", "Diaz", "rosa@clinic.com", "999777888", "Morning", "Admission")
+    requests = [(candidate, time(8 + minute // 60, minute % 60))
+                for candidate in (doctor, other) for minute in range(0, 240, 15)] * 8
+    barrier = threading.Barrier(16)
+    
+    def book(index: int):
+        if index < 16:
+            barrier.wait()
+        candidate, start = requests[index]
+        return secretary.schedule_medical_appointment(candidate, patient, monday, start, "General consultation")
+    
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        booked = [appointment for appointment in pool.map(book, range(len(requests))) if appointment]
+    
+    assert booked
+    assert len({appointment.get_id() for appointment in booked}) == len(booked)
+    intervals = sorted((appointment.get_start_minute(), appointment.get_end_minute()) for appointment in booked)
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(intervals, intervals[1:]))
+    assert all(appointment.get_room().get_number() == 101 for appointment in booked)
+    for candidate in (doctor, other):
+        assert len(candidate.get_daily_appointments(monday)) == clinic.get_daily_appointment_count(
+            candidate.get_id(), monday)
+    assert clinic.get_operational_metrics()['total_appointments'] == len(booked)
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+import json
+
+from Clinic_Import import import_appointments, import_patients
+from Clinic_Storage import SQLiteStorage
+from Clinic_System import Clinic
+
+def write_lines(path, lines) -> str:
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+def test_patient_import_counts_duplicates_and_rejects_invalid_rows(clinic, tmp_path):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    path = write_lines(tmp_path / "patients.jsonl", [
+        {'id': "P002", 'name': "Eva", 'last_name': "Soto", 'birth_date': "1985-02-03"},
+        {'id': "P002", 'name': "Eva", 'last_name': "Soto", 'birth_date': "1985-02-03"},
+        {'id': "P001", 'name': "Luis", 'last_name': "Rojas", 'birth_date': "1990-05-01"},
+        "{not json",
+        {'id': "P003", 'name': "Ivan", 'last_name': "Paz"},
+        {'id': "P004", 'name': "Noa", 'last_name': "Rey", 'birth_date': "03/02/1985"},
+        {'id': "P005", 'name': "Sol", 'last_name': "Gil", 'birth_date': tomorrow},
+    ])
+    
+    report = import_patients(clinic, path, chunk_size=3)
+    assert (report.rows_read, report.imported, report.duplicates, report.rejected) == (7, 1, 2, 4)
+    assert [line for line, _ in report.errors] == [4, 5, 6, 7]
+    assert report.errors[1][1] == "missing birth_date"
+    assert clinic.find_patient_by_id("P002").get_name() == "Eva"
+    assert clinic.find_patient_by_id("P004") is None
+
+def test_appointment_import_skips_duplicates_on_reimport(doctor, patient, tmp_path, monday):
+    clinic = Clinic("Marbella Clinic", "Lima, Peru", SQLiteStorage(str(tmp_path / "clinic.db")))
+    clinic.hire_doctor(doctor)
+    clinic.register_patient(patient)
+    day = monday.isoformat()
+    row = {'doctor_id': "M001", 'patient_id': "P001", 'date': day, 'consultation_type': "Checkup"}
+    path = write_lines(tmp_path / "appointments.jsonl", [
+        dict(row, id="A001", time="09:00"),
+        dict(row, id="A001", time="11:00"),
+        dict(row, id="A002", time="09:15"),
+        dict(row, id="A003", time="10:00", status="Cancelled"),
+        dict(row, id="A004", time="25:00"),
+        dict(row, id="A005", time="12:00", status="Pending"),
+        dict(row, id="A006", time="12:00", duration="long"),
+        dict(row, id="A007", time="12:00", doctor_id="M999"),
+        dict(row, id="A008", time="12:00", patient_id=None),
+        "[1, 2]",
+    ])
+    
+    report = import_appointments(clinic, path, chunk_size=4)
+    assert (report.rows_read, report.imported, report.duplicates, report.rejected) == (10, 2, 1, 7)
+    assert [reason for _, reason in report.errors] == [
+        "slot not available", "invalid date or time", "unknown status 'Pending'", "invalid duration",
+        "unknown doctor or patient", "missing patient_id", "malformed record"]
+    assert [appointment.get_id() for appointment in doctor.get_daily_appointments(monday)] == ["A001"]
+    metrics = clinic.get_operational_metrics()
+    assert (metrics['total_appointments'], metrics['cancelled_appointments']) == (2, 1)
+    
+    report = import_appointments(clinic, path)
+    assert (report.imported, report.duplicates, report.rejected) == (0, 3, 7)
+    assert clinic.get_operational_metrics()['total_appointments'] == 2
+    clinic.close()
@@ -0,0 +1,42 @@
+from datetime import date, time, timedelta
+
+from Clinic_Journal import ClinicJournal
+from Clinic_System import Appointment, Clinic, Doctor, Patient
+
+def next_monday() -> date:
+    day = date.today() + timedelta(days=1)
+    return day + timedelta(days=-day.weekday() % 7)
+
+def test_snapshot_keeps_cancelled_and_archived_appointments(tmp_path):
+    journal = ClinicJournal(str(tmp_path), sync=False)
+    clinic = Clinic("Marbella Clinic", "Lima, Peru")
+    journal.attach(clinic)
+    doctor = Doctor("M001", "Ana", "Torres", "ana@clinic.com", "999111222", "Cardiology", 100.0)
+    patient = Patient("P001", "Luis", "Rojas", "luis@mail.com", "999333444", date(1990, 5, 1))
+    clinic.hire_doctor(doctor)
+    clinic.register_patient(patient)
+    
+    day = next_monday()
+    kept = Appointment("A001", day, time(9, 0), doctor, patient, "Checkup")
+    cancelled = Appointment("A002", day, time(10, 0), doctor, patient, "Checkup")
+    past = Appointment("A003", day - timedelta(days=14), time(9, 0), doctor, patient, "Checkup")
+    assert doctor.schedule_appointment(kept)
+    assert doctor.schedule_appointment(cancelled)
+    assert doctor.schedule_appointment(past)
+    cancelled.cancel()
+    assert [appointment.get_id() for appointment in clinic.compact_schedules(day)] == ["A003"]
+    
+    expected = clinic.get_operational_metrics()
+    assert expected['total_appointments'] == 3
+    assert expected['cancelled_appointments'] == 1
+    journal.snapshot()
+    journal.close()
+    
+    recovered = Clinic("Marbella Clinic", "Lima, Peru")
+    ClinicJournal(str(tmp_path), sync=False).recover(recovered)
+    metrics = recovered.get_operational_metrics()
+    assert metrics['total_appointments'] == expected['total_appointments']
+    assert metrics['cancelled_appointments'] == expected['cancelled_appointments']
+    assert metrics['cancellation_rate'] == expected['cancellation_rate']
+    assert sorted(appointment.get_id() for appointment in recovered.get_archived_appointments()) == ["A002", "A003"]
+    assert [appointment.get_id() for appointment in recovered.find_doctor_by_id("M001")._schedule] == ["A001"]
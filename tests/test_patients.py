@@ -0,0 +1,12 @@
+from datetime import date
+
+def test_patient_summary_is_memoized_until_an_edit(clinic, patient):
+    summary = patient.get_complete_info()
+    assert patient.get_complete_info() is summary
+    
+    patient.set_name("Luisa", "Rojas")
+    assert patient.get_complete_info() == f"Patient: Luisa Rojas | ID: P001 | Age: {patient.get_age()} years"
+    assert [found.get_id() for found in clinic.find_patient_by_name("Luisa")] == ["P001"]
+    
+    patient.set_birth_date(date(2000, 5, 1))
+    assert f"Age: {patient.get_age()} years" in patient.get_complete_info()
@@ -0,0 +1,17 @@
+import re
+
+from Clinic_Profiling import OperationProfiler
+
+def bucket_labels(text: str) -> list:
+    return re.findall(r'_bucket\{(operation="[^"]+",le="[^"]+")\}', text)
+
+def test_prometheus_bucket_ladder_is_stable_across_scrapes(clinic):
+    with OperationProfiler() as profiler:
+        first = profiler.to_prometheus()
+        clinic.find_patient_by_id("P001")
+        clinic.find_patient_by_name("Luis")
+        second = profiler.to_prometheus()
+    
+    assert bucket_labels(first) == bucket_labels(second)
+    assert 'clinisoft_operation_duration_seconds_count{operation="Clinic.find_patient_by_id"} 1' in second
+    assert 'clinisoft_operation_duration_seconds_count{operation="Clinic.register_patient"} 0' in first
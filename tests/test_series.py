@@ -0,0 +1,33 @@
+from datetime import time, timedelta
+
+from Clinic_Analytics import AnalyticsSnapshot
+from Clinic_System import Appointment, RecurrenceRule
+
+def test_series_conflict_then_cancel_only_counts_booked_occurrences(clinic, doctor, patient, monday):
+    existing = Appointment("B1", monday + timedelta(days=7), time(9, 0), doctor, patient, "Checkup")
+    assert doctor.schedule_appointment(existing)
+    waiting = clinic.add_to_waitlist(patient, doctor=doctor)
+    
+    series = doctor.schedule_series(patient, monday, time(9, 0), RecurrenceRule("weekly", count=3), "Therapy",
+                                    atomic=False)
+    assert len(series.get_appointments()) == 2
+    [conflict] = series.get_conflicts()
+    assert conflict.get_date() == existing.get_date()
+    
+    conflict.cancel()
+    assert conflict.get_status() == "Scheduled"
+    assert waiting.get_appointment() is None
+    metrics = clinic.get_operational_metrics()
+    assert metrics['total_appointments'] == 3
+    assert metrics['cancelled_appointments'] == 0
+    assert clinic.get_daily_appointment_count(doctor.get_id(), existing.get_date()) == 1
+    
+    assert series.cancel(monday) == 2
+    assert waiting.get_appointment().get_date() == monday
+    metrics = clinic.get_operational_metrics()
+    assert metrics['total_appointments'] == 4
+    assert metrics['cancelled_appointments'] == 2
+    assert clinic.get_daily_appointment_count(doctor.get_id(), existing.get_date()) == 1
+    assert [appointment.get_id() for appointment in doctor.get_daily_appointments(existing.get_date())] == ["B1"]
+    rates = AnalyticsSnapshot.from_clinic(clinic).status_rates()['Cardiology']
+    assert (rates['appointments'], rates['cancelled']) == (4, 2)
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime, time, timedelta
+from http import HTTPStatus
+
+import pytest
+
+from Clinic_Server import ClinicApi
+from Clinic_System import Appointment
+
+@pytest.fixture
+def api(clinic):
+    api = ClinicApi(clinic, workers=2)
+    yield api
+    api.close()
+
+def test_free_slots_stay_inside_the_requested_window(clinic, doctor, patient, monday):
+    doctor.set_working_hours(monday.weekday(), [(time(8, 0), time(12, 0))])
+    assert doctor.schedule_appointment(Appointment("A1", monday, time(9, 0), doctor, patient, "Checkup"))
+    
+    start = datetime.combine(monday, time(8, 45))
+    end = datetime.combine(monday, time(10, 0))
+    slots = clinic.find_available_slots("Cardiology", start, end, count=10)
+    assert [slot.start.time() for slot in slots] == [time(9, 30)]
+    assert all(start <= slot.start and slot.start + timedelta(minutes=slot.duration_minutes) <= end
+               for slot in slots)
+    assert clinic.find_available_slots("Cardiology", start, end, count=10, duration_minutes=90) == []
+
+def test_slots_endpoint_caps_the_search_range(api, doctor, monday):
+    doctor.set_working_hours(monday.weekday(), [(time(8, 0), time(12, 0))])
+    
+    def get_slots(days: int):
+        start = datetime.combine(monday, time(8, 0))
+        target = (f"/slots?specialty=Cardiology&from={start.isoformat(timespec='minutes')}"
+                  f"&to={(start + timedelta(days=days)).isoformat(timespec='minutes')}&count=3")
+        return asyncio.run(api.dispatch("GET", target, b""))
+    
+    status, body = get_slots(ClinicApi.MAX_SLOT_RANGE_DAYS + 1)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "31 days" in body['error']
+    
+    status, body = get_slots(ClinicApi.MAX_SLOT_RANGE_DAYS)
+    assert status == HTTPStatus.OK
+    assert [slot['start'][11:] for slot in body] == ["08:00", "08:15", "08:30"]
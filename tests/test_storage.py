@@ -0,0 +1,67 @@
+from datetime import date, time, timedelta
+
+from Clinic_Storage import SQLiteStorage
+from Clinic_System import Appointment, Clinic, ConsultingRoom, Doctor, Patient
+
+def open_clinic(path) -> Clinic:
+    return Clinic("Marbella Clinic", "Lima, Peru", SQLiteStorage(str(path)))
+
+def seed(path, monday: date) -> None:
+    clinic = open_clinic(path)
+    clinic.add_consulting_room(ConsultingRoom(101, "Cardiology"))
+    doctor = Doctor("M001", "Ana", "Torres", "ana@clinic.com", "999111222", "Cardiology", 100.0)
+    patient = Patient("P001", "Luis", "Rojas", "luis@mail.com", "999333444", date(1990, 5, 1))
+    clinic.hire_doctor(doctor)
+    clinic.register_patient(patient)
+    past = monday - timedelta(days=14)
+    for appointment_id, day, start in (("A001", past, time(9, 0)), ("A002", past, time(10, 0)),
+                                       ("A003", monday, time(9, 0)), ("A004", monday, time(10, 0))):
+        assert doctor.schedule_appointment(Appointment(appointment_id, day, start, doctor, patient, "Checkup"))
+    for appointment in doctor.get_daily_appointments(past)[1:] + doctor.get_daily_appointments(monday)[1:]:
+        appointment.cancel()
+    clinic.close()
+
+def test_round_trip_keeps_past_appointment_metrics(tmp_path, monday):
+    path = tmp_path / "clinic.db"
+    seed(path, monday)
+    
+    clinic = open_clinic(path)
+    metrics = clinic.get_operational_metrics()
+    assert metrics['total_appointments'] == 4
+    assert metrics['cancelled_appointments'] == 2
+    assert metrics['cancellation_rate'] == 0.5
+    past = monday - timedelta(days=14)
+    assert clinic.get_daily_appointment_count("M001", past) == 1
+    assert clinic.get_daily_appointment_count("M001", monday) == 1
+    doctor = clinic.find_doctor_by_id("M001")
+    assert [appointment.get_id() for appointment in doctor.get_daily_appointments(monday)] == ["A003"]
+    clinic.close()
+
+def test_stored_past_slot_cannot_be_booked_again(tmp_path, monday):
+    path = tmp_path / "clinic.db"
+    seed(path, monday)
+    
+    clinic = open_clinic(path)
+    doctor = clinic.find_doctor_by_id("M001")
+    patient = clinic.find_patient_by_id("P001")
+    past = monday - timedelta(days=14)
+    assert not doctor.schedule_appointment(Appointment("A005", past, time(9, 15), doctor, patient, "Checkup"))
+    assert doctor.schedule_appointment(Appointment("A006", past, time(10, 0), doctor, patient, "Checkup"))
+    assert not doctor.schedule_appointment(Appointment("A007", past, time(10, 0), doctor, patient, "Checkup"))
+    assert clinic.get_daily_appointment_count("M001", past) == 2
+    clinic.close()
+
+def test_iterating_stored_patients_does_not_fill_the_cache(tmp_path):
+    clinic = open_clinic(tmp_path / "clinic.db")
+    for i in range(25):
+        assert clinic.register_patient(Patient(f"P{i:03d}", "Luis", f"Rojas{i}", "luis@mail.com", "999333444",
+                                               date(1990, 5, 1)))
+    kept = clinic.find_patient_by_id("P007")
+    
+    patients = list(clinic._patients)
+    assert [patient.get_id() for patient in patients] == [f"P{i:03d}" for i in range(25)]
+    assert patients[7] is kept
+    del patients
+    assert list(clinic._patients._by_id) == ["P007"]
+    assert not clinic.register_patient(Patient("P003", "Ana", "Rojas", "", "", date(1990, 5, 1)))
+    clinic.close()